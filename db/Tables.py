@@ -1,15 +1,16 @@
-import uuid
 from sqlalchemy import (MetaData,
                         Table,
                         Column,
                         String,
                         Text,
                         ForeignKey,
+                        Index,
                         UniqueConstraint,
                         JSON,
                         Float,
                         DateTime)
 import datetime
+from utils.id_utils import new_id
 
 METADATA = MetaData()
 # ---------------------
@@ -35,7 +36,7 @@ gpt_templates = Table(
            String,
            primary_key=True,
            index=True,
-           default=lambda: str(uuid.uuid4())),
+           default=new_id),
     Column("profile_id",
            String,
            ForeignKey("profiles.id", ondelete="CASCADE"),
@@ -59,7 +60,7 @@ profile_transcripts = Table(
            String,
            primary_key=True,
            index=True,
-           default=lambda: str(uuid.uuid4())),
+           default=new_id),
     Column("profile_id",
            String,
            ForeignKey("profiles.id", ondelete="CASCADE"),
@@ -76,8 +77,18 @@ profile_transcripts = Table(
     Column("audio_file_path",
            String,
            nullable=True),
-    Column("created_at", DateTime, default=datetime.datetime.now)
+    Column("created_at", DateTime, default=datetime.datetime.now),
+    # blake2b of the uploaded bytes, keyed by the clean-audio flag
+    Column("audio_sha",
+           String,
+           nullable=True),
 )
+Index("ix_profile_transcripts_profile_created",
+      profile_transcripts.c.profile_id,
+      profile_transcripts.c.created_at.desc())
+Index("ix_profile_transcripts_profile_audio_sha",
+      profile_transcripts.c.profile_id,
+      profile_transcripts.c.audio_sha)
 # ---------------------------
 # --- Profile Files Table ---
 profile_files = Table(
@@ -87,7 +98,7 @@ profile_files = Table(
            String,
            primary_key=True,
            index=True,
-           default=lambda: str(uuid.uuid4())),
+           default=new_id),
     Column("profile_id",
            String,
            ForeignKey("profiles.id", ondelete="CASCADE"),
@@ -110,6 +121,9 @@ profile_files = Table(
            ForeignKey("profile_transcripts.id"),
            nullable=True),
 )
+Index("ix_profile_files_profile_type",
+      profile_files.c.profile_id,
+      profile_files.c.file_type)
 # -------------------
 # --- Clips Table ---
 clips = Table(
@@ -119,7 +133,7 @@ clips = Table(
            String,
            primary_key=True,
            index=True,
-           default=lambda: str(uuid.uuid4())),
+           default=new_id),
     Column("profile_id",
            String,
            ForeignKey("profiles.id", ondelete="CASCADE"),
@@ -148,4 +162,7 @@ clips = Table(
            DateTime,
            default=datetime.datetime.now),
 )
+Index("ix_clips_profile_created",
+      clips.c.profile_id,
+      clips.c.created_at.desc())
 # ------------------------------
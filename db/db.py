@@ -1,8 +1,15 @@
 import os
-from databases import Database
-from sqlalchemy import create_engine
+import orjson
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
+from typing import Any, AsyncIterator, List, Optional, Sequence
+from sqlalchemy import event, inspect
+from sqlalchemy.engine import make_url
+from sqlalchemy.schema import CreateIndex, CreateTable
+from sqlalchemy.ext.asyncio import (AsyncConnection,
+                                    AsyncEngine,
+                                    create_async_engine)
 from db.Tables import METADATA
-from db.Tables import (gpt_templates)
 from pathlib import Path
 
 # Check if Data Folder exists
@@ -10,24 +17,189 @@ project_root = Path(__file__).resolve().parent.parent
 path_data = project_root / "data"
 path_data.mkdir(parents=True, exist_ok=True)
 DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///./data/mirumoji.db")
-database = Database(DATABASE_URL)
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "8"))
 METADATA = METADATA
-engine = create_engine(DATABASE_URL)
-METADATA.create_all(engine)
+
+
+def _async_url(url: str):
+    """
+    Map a plain 'sqlite://' URL onto the aiosqlite driver.
+    """
+    u = make_url(url)
+    if u.drivername == "sqlite":
+        u = u.set(drivername="sqlite+aiosqlite")
+    return u
+
+
+def _json_dumps(obj: Any) -> str:
+    return orjson.dumps(obj).decode()
+
+
+# Long-lived pooled connections keep SQLite's page cache warm across
+# requests instead of opening/closing a connection per query.
+engine: AsyncEngine = create_async_engine(_async_url(DATABASE_URL),
+                                          pool_size=DB_POOL_SIZE,
+                                          max_overflow=0,
+                                          json_serializer=_json_dumps,
+                                          json_deserializer=orjson.loads)
+
+SQLITE_PRAGMAS = (
+    "PRAGMA journal_mode=WAL",
+    "PRAGMA synchronous=NORMAL",
+    "PRAGMA temp_store=MEMORY",
+    "PRAGMA cache_size=-65536",
+    "PRAGMA mmap_size=268435456",
+    "PRAGMA foreign_keys=ON",
+)
+
+if DATABASE_URL.startswith("sqlite"):
+    @event.listens_for(engine.sync_engine, "connect")
+    def _set_sqlite_pragmas(dbapi_conn, _conn_record) -> None:
+        """
+        Tune every new pooled connection: WAL lets readers run alongside
+        the single writer, and the larger cache / mmap keep the small
+        metadata tables in memory.
+        """
+        cursor = dbapi_conn.cursor()
+        for pragma in SQLITE_PRAGMAS:
+            cursor.execute(pragma)
+        cursor.close()
+
+
+class Database:
+    """
+    Minimal async facade over the pooled engine, exposing the
+    `execute` / `fetch_one` / `fetch_all` / `transaction` helpers
+    used throughout the routers.
+    """
+    def __init__(self, engine: AsyncEngine):
+        self.engine = engine
+        self._tx_conn: ContextVar[Optional[AsyncConnection]] = ContextVar(
+            "tx_conn", default=None)
+
+    @asynccontextmanager
+    async def connection(self) -> AsyncIterator[AsyncConnection]:
+        """
+        Check out a pooled connection, reusing the one bound to the
+        current transaction if there is one.
+        """
+        conn = self._tx_conn.get()
+        if conn is not None:
+            yield conn
+            return
+        async with self.engine.begin() as conn:
+            yield conn
+
+    @asynccontextmanager
+    async def transaction(self) -> AsyncIterator[AsyncConnection]:
+        """
+        Run every statement issued inside the block on one connection
+        and commit them together.
+        """
+        if self._tx_conn.get() is not None:
+            yield self._tx_conn.get()
+            return
+        async with self.engine.begin() as conn:
+            token = self._tx_conn.set(conn)
+            try:
+                yield conn
+            finally:
+                self._tx_conn.reset(token)
+
+    @staticmethod
+    async def _run(conn: AsyncConnection, query, params: Sequence):
+        """
+        Plain SQL strings bypass expression compilation and go straight
+        to the driver, whose statement cache reuses the prepared plan.
+        """
+        if isinstance(query, str):
+            return await conn.exec_driver_sql(query, tuple(params))
+        return await conn.execute(query)
+
+    async def execute(self, query, params: Sequence = ()) -> int:
+        """Execute a statement and return the affected row count."""
+        async with self.connection() as conn:
+            result = await self._run(conn, query, params)
+            return result.rowcount
+
+    async def fetch_one(self, query, params: Sequence = ()) -> Optional[Any]:
+        async with self.connection() as conn:
+            result = await self._run(conn, query, params)
+            return result.first()
+
+    async def fetch_all(self, query, params: Sequence = ()) -> List[Any]:
+        async with self.connection() as conn:
+            result = await self._run(conn, query, params)
+            return result.fetchall()
+
+
+database = Database(engine)
 
 
 async def get_db() -> Database:
     return database
 
 
+_schema_ready = False
+
+
+def _add_missing_columns(sync_conn, table) -> None:
+    """
+    ALTER TABLE ... ADD COLUMN for nullable columns declared after the
+    table was first created.
+    """
+    existing = {c["name"] for c in inspect(sync_conn).get_columns(
+        table.name)}
+    preparer = sync_conn.dialect.identifier_preparer
+    for column in table.columns:
+        if column.name in existing or not column.nullable:
+            continue
+        col_type = column.type.compile(dialect=sync_conn.dialect)
+        sync_conn.exec_driver_sql(
+            f"ALTER TABLE {preparer.format_table(table)} "
+            f"ADD COLUMN {preparer.format_column(column)} {col_type}")
+
+
+def _create_schema(sync_conn) -> None:
+    """
+    Emit CREATE TABLE / CREATE INDEX ... IF NOT EXISTS for every table.
+    Idempotent, so concurrent worker boots can't race each other, and
+    columns or indexes declared after a database was created are still
+    added.
+    """
+    for table in METADATA.sorted_tables:
+        sync_conn.execute(CreateTable(table, if_not_exists=True))
+        _add_missing_columns(sync_conn, table)
+        for index in table.indexes:
+            sync_conn.execute(CreateIndex(index, if_not_exists=True))
+
+
 async def connect_db() -> None:
-    await database.connect()
+    """
+    Create the schema once at application startup.
+    """
+    global _schema_ready
+    if _schema_ready:
+        return
+    async with engine.begin() as conn:
+        await conn.run_sync(_create_schema)
+    _schema_ready = True
 
 
 async def disconnect_db() -> None:
-    await database.disconnect()
+    await engine.dispose()
+
+
+# Hot per-request lookups kept as fixed SQL text
+_Q_GPT_TEMPLATE = ("SELECT id, sys_msg, prompt FROM gpt_templates "
+                   "WHERE profile_id = ?")
+_Q_PROFILE_EXISTS = "SELECT 1 FROM profiles WHERE id = ?"
 
 
 async def get_gpt_template_db(profile_id: str):
-    q = gpt_templates.select().where(gpt_templates.c.profile_id == profile_id)
-    return await database.fetch_one(q)
+    return await database.fetch_one(_Q_GPT_TEMPLATE, (profile_id,))
+
+
+async def profile_exists_db(profile_id: str) -> bool:
+    return await database.fetch_one(_Q_PROFILE_EXISTS,
+                                    (profile_id,)) is not None
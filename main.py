@@ -3,27 +3,66 @@ import logging
 from fastapi import FastAPI, Request, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
-from fastapi.responses import JSONResponse
+from fastapi.responses import ORJSONResponse
 from pathlib import Path
 from routers.gpt_router import gpt_router
-from routers.audio_router import audio_router
+from routers.audio_router import audio_router, GPT_PLACEHOLDERS
 from routers.health_router import health_router
 from routers.dict_router import dict_router
 from routers.video_router import video_router
 from routers.profile_router import profile_router
 from contextlib import asynccontextmanager
-from db.db import connect_db, disconnect_db, DATABASE_URL
+from sqlalchemy import select
+from db.db import connect_db, disconnect_db, get_db, DATABASE_URL
+from db.Tables import profile_transcripts
+from model_manager import load_fwhisper, make_batcher
+from processing.gpt_cache import close_gpt_cache
+from processing.text_processing import save_lemma_cache
+from utils.env_utils import using_modal
+from utils.middleware_utils import SelectiveGZipMiddleware
+from utils.tmp_utils import tmp_root, cleanup_tmp_root
+import asyncio
+import os
 
 logging.basicConfig(level=logging.INFO,
                     format="%(levelname)8s %(name)s | %(message)s",
                     )
 logger = logging.getLogger(__name__)
 
+GPT_CACHE_WARM_LIMIT = int(os.getenv("GPT_CACHE_WARM_LIMIT", "500"))
+
 # ───────────────────────────────────────────────────────────
 # App setup
 # ───────────────────────────────────────────────────────────
 
 
+async def warm_gpt_cache() -> None:
+    """
+    Preload the GPT response cache with the most recent transcript
+    explanations so repeat queries skip the API and the embedding call.
+    """
+    if GPT_CACHE_WARM_LIMIT <= 0:
+        return
+    from processing.text_processing import get_gpt_explainer
+    db = await get_db()
+    q = (select(profile_transcripts.c.transcript,
+                profile_transcripts.c.gpt_explanation)
+         .where(profile_transcripts.c.gpt_explanation.isnot(None))
+         .order_by(profile_transcripts.c.created_at.desc())
+         .limit(GPT_CACHE_WARM_LIMIT))
+    rows = [(r.transcript, r.gpt_explanation)
+            for r in await db.fetch_all(q)
+            if r.transcript and r.transcript.strip()
+            and not r.gpt_explanation.startswith(GPT_PLACEHOLDERS)]
+    if not rows:
+        return
+    try:
+        n = await asyncio.to_thread(get_gpt_explainer().warm_cache, rows)
+        logger.info(f"GPT cache warmed with {n} explanations")
+    except Exception as e:
+        logger.warning(f"Skipping GPT cache warm-up: {e}")
+
+
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     await connect_db()
@@ -32,18 +71,37 @@ async def lifespan(app: FastAPI):
     media_files_tmp = Path("media_files/temp").resolve()
     media_files_tmp.mkdir(exist_ok=True)
     logger.info(f"Storage ensured at: '{media_files.parent}'")
+    app.state.tmp_root = tmp_root()
+    await warm_gpt_cache()
+    # Load Whisper once and share it across requests
+    app.state.fwhisper = None
+    app.state.fwhisper_batcher = None
+    if not using_modal():
+        app.state.fwhisper = await asyncio.to_thread(load_fwhisper)
+        app.state.fwhisper_batcher = make_batcher(app.state.fwhisper)
+        await app.state.fwhisper_batcher.start()
     yield
+    if app.state.fwhisper_batcher is not None:
+        await app.state.fwhisper_batcher.stop()
+    app.state.fwhisper_batcher = None
+    app.state.fwhisper = None
+    await asyncio.to_thread(close_gpt_cache)
+    await asyncio.to_thread(save_lemma_cache)
+    cleanup_tmp_root()
     await disconnect_db()
 
 
 app = FastAPI(
     title="Mirumoji",
     description="Japanese sentence breakdown, audio processing and GPT.",
-    lifespan=lifespan
+    lifespan=lifespan,
+    default_response_class=ORJSONResponse
 )
 
+# Directory is created in lifespan, skip Starlette's existence check
 app.mount("/media",
-          StaticFiles(directory=Path("media_files").resolve()),
+          StaticFiles(directory=Path("media_files").resolve(),
+                      check_dir=False),
           name="media")
 
 origins = ["*"]
@@ -52,14 +110,18 @@ app.add_middleware(
     CORSMiddleware,
     allow_origins=origins,
     allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
+    # Explicit lists are plain set lookups in Starlette, and max_age lets
+    # browsers cache the preflight for a day
+    allow_methods=["GET", "POST", "DELETE", "OPTIONS"],
+    allow_headers=["content-type", "authorization", "x-profile-id"],
+    max_age=86400,
 )
+app.add_middleware(SelectiveGZipMiddleware, minimum_size=1024)
 
 
 @app.exception_handler(HTTPException)
 async def http_exception_handler(request: Request, exc: HTTPException):
-    return JSONResponse(
+    return ORJSONResponse(
         status_code=exc.status_code,
         content={"success": False,
                  "message": exc.detail},
@@ -1,151 +1,263 @@
-from typing import Union, Generator
+from typing import Union, Generator, List
 import modal
 import logging
-from processing.whisper_wrapper import FWhisperWrapper
-from processing.audio_processing import AudioTools
+import os
+import queue
+import threading
 from pathlib import Path
-from dotenv import load_dotenv
-
-load_dotenv()
+# Configure logging once per container at import; the local client
+# keeps the FastAPI app's configuration.
+if not modal.is_local():
+    logging.basicConfig(level=logging.INFO,
+                        style="{",
+                        format="{levelname}-{name}-{message}"
+                        )
 logger = logging.getLogger(__name__)
 
 # --- Modal Setup ---
-script_dir = Path(__file__).resolve().parent
-project_root_dir = script_dir.parent
-media_files_path = project_root_dir / "media_files"
-media_files_path.mkdir(parents=True,
-                       exist_ok=True)
-
-logger.info(f"Config Image + Mount {media_files_path} at /root/media_files")
-# Build media_files on modal container startup
-mirumoji_image = modal.Image.from_registry(
-    "docker.io/svdc1/mirumoji-modal-gpu:latest"
-).add_local_dir(media_files_path,
-                remote_path="/root/media_files")
+# Inputs are uploaded per call to a persisted Volume mounted at
+# /root/media_files, instead of re-syncing the whole local media_files
+# directory into the image on every run.
+MEDIA_VOLUME_NAME = "mirumoji-media"
+REMOTE_MEDIA_ROOT = "/root/media_files"
+# Volume directory converted videos are written to
+CONVERTED_DIR = "converted"
+media_volume = modal.Volume.from_name(MEDIA_VOLUME_NAME,
+                                      create_if_missing=True)
+
+mirumoji_image = (
+    modal.Image.from_registry("docker.io/svdc1/mirumoji-modal-gpu:latest")
+    .pip_install("PyNvVideoCodec==1.0.2")
+)
 
 logger.info("Configured.")
 
+# Keep a container warm between bursts instead of reloading Whisper.
+# Containers are only pinned when asked for: each one is a billed A10G.
+MODAL_SCALEDOWN_WINDOW = int(os.getenv("MODAL_SCALEDOWN_WINDOW", "300"))
+MODAL_MIN_CONTAINERS = int(os.getenv("MODAL_MIN_CONTAINERS", "0"))
+
+# Credentials reach the container as Modal Secrets (comma-separated
+# names) rather than through a .env file baked into the image
+MODAL_SECRETS = [modal.Secret.from_name(name.strip())
+                 for name in os.getenv("MODAL_SECRET_NAMES", "").split(",")
+                 if name.strip()]
+
+STREAM_CHUNK_SIZE = 4 * 1024 * 1024
+# Chunks read ahead of the consumer; caps buffered bytes at
+# STREAM_PREFETCH_CHUNKS * STREAM_CHUNK_SIZE (16 MiB by default)
+STREAM_PREFETCH_CHUNKS = int(os.getenv("STREAM_PREFETCH_CHUNKS", "4"))
+
+# The API calls the deployed app by these names, see
+# Processor._modal; deploy with `modal deploy modal_processing/ModalApp.py`
+APP_NAME = "mirumoji-gpu"
+WORKER_CLS_NAME = "GpuWorker"
+
 app = modal.App(
-    "mirumoji-gpu",
+    APP_NAME,
     image=mirumoji_image
 )
 # --- End Modal Setup ---
 
 
-@app.function(
-    gpu="A10G",
-    timeout=600,
-    include_source=True
-)
-def transcribe_srt_job(OPENAI_API_KEY: str,
-                       media_fp: Union[str, Path]
-                       ) -> Union[str, None]:
+def _prefetch_file(path: Path,
+                   chunk_size: int = STREAM_CHUNK_SIZE,
+                   prefetch_chunks: int = STREAM_PREFETCH_CHUNKS
+                   ) -> Generator[bytes, None, None]:
     """
-    Runs Whisper transcription on media_fp, fixes with GPT,
-    and returns SRT string.
+    Yield `path` in chunks while a reader thread stays at most
+    `prefetch_chunks` ahead, so disk reads overlap the network send
+    without buffering the whole file.
     """
+    buf: queue.Queue = queue.Queue(maxsize=max(1, prefetch_chunks))
+    done = object()
+    stop = threading.Event()
 
-    logging.basicConfig(level=logging.INFO,
-                        style="{",
-                        format="{levelname}-{name}-{message}"
-                        )
+    def reader():
+        try:
+            with open(path, "rb", buffering=0) as f:
+                while not stop.is_set():
+                    chunk = f.read(chunk_size)
+                    if not chunk:
+                        break
+                    buf.put(chunk)
+            buf.put(done)
+        except Exception as e:
+            buf.put(e)
 
-    logger.info(f"transcribe_srt_job started for media: {media_fp}")
+    t = threading.Thread(target=reader, daemon=True)
+    t.start()
     try:
-        fwhisper = FWhisperWrapper()
-
-        gpt_model_kwargs = {
-            "ApiKey": OPENAI_API_KEY,
-            "from_dotenv": False
-        }
-        srt_result_string = fwhisper.transcribe_to_srt(
-            audio_path=str(media_fp),
-            output_path=" ",
-            string_result=True,
-            fix_with_chat_gpt=True,
-            gpt_model_kwargs=gpt_model_kwargs
-            )
-
-        if srt_result_string:
-            logger.info(f"Generated SRT For: {media_fp}")
-            return srt_result_string
-        else:
-            logger.warning(f"SRT Transcription Failed For: {media_fp}")
-            return None
-    except Exception as e:
-        logger.error(f"Error in transcribe_srt_job for {media_fp}: {e}",
-                     exc_info=True)
-        return None
+        while True:
+            item = buf.get()
+            if item is done:
+                return
+            if isinstance(item, Exception):
+                raise item
+            yield item
+    finally:
+        # Unblock the reader if the consumer stopped early
+        stop.set()
+        while t.is_alive():
+            try:
+                buf.get_nowait()
+            except queue.Empty:
+                t.join(timeout=0.05)
 
 
-@app.function(
+@app.cls(
     gpu="A10G",
     timeout=600,
     include_source=True,
-    is_generator=True
+    scaledown_window=MODAL_SCALEDOWN_WINDOW,
+    min_containers=MODAL_MIN_CONTAINERS,
+    volumes={REMOTE_MEDIA_ROOT: media_volume},
+    secrets=MODAL_SECRETS
 )
-def video_conversion_job(video_fp: Union[str, Path],
-                         ) -> Generator[bytes, None, None]:
+class GpuWorker:
     """
-    Converts video_fp to MP4 using NVENC and returns the
-    video content as bytes.
+    Keeps one Whisper model and AudioTools instance resident per
+    container; every method call reuses them instead of reloading.
     """
-    logging.basicConfig(level=logging.INFO,
-                        style="{",
-                        format="{levelname}-{name}-{message}"
-                        )
-
-    logger.info(f"video_conversion_job started for video: {video_fp}")
-    tmp_p = Path.cwd() / "tmp"
-    logger.info(f"Using temporary directory for video conversion: {tmp_p}")
 
-    audio_tools = AudioTools(working_dir=tmp_p)
+    @modal.enter()
+    def load(self):
+        # Imported here so the local client never loads the model stack
+        from processing.whisper_wrapper import FWhisperWrapper
+        from processing.audio_processing import AudioTools
+        self.fwhisper = FWhisperWrapper(device="cuda",
+                                        compute_type="int8_float16",
+                                        batch_size=16)
+        self.tmp_p = Path.cwd() / "tmp"
+        self.audio_tools = AudioTools(working_dir=self.tmp_p)
+        logger.info("Whisper model loaded")
 
-    input_p = Path(video_fp)
-    outp_local = tmp_p / f"{input_p.stem}_converted.mp4"
-
-    try:
-        logger.info(f"Converting {video_fp} to {outp_local} using NVENC.")
-        result_p = audio_tools.to_mp4(
+    def _convert(self,
+                 video_fp: Union[str, Path],
+                 output_p: Path,
+                 nvenc_preset: str,
+                 nvenc_tune: str) -> Path:
+        """
+        Run the NVENC conversion, raising if no output was produced.
+        """
+        media_volume.reload()
+        logger.info(f"Converting {video_fp} to {output_p} using NVENC.")
+        result_p = self.audio_tools.to_mp4(
             input_path=str(video_fp),
-            output_path=str(outp_local),
-            use_nvenc=True
+            output_path=str(output_p),
+            use_nvenc=True,
+            use_pynvc=True,
+            nvenc_preset=nvenc_preset,
+            nvenc_tune=nvenc_tune
         )
-
-        if result_p and result_p.exists() and result_p.stat().st_size > 0:
-            logger.info(f"Converted video to: {result_p}")
-            video_bytes = result_p.read_bytes()
-            logger.info(
-                f"Returning {len(video_bytes)} bytes for converted video.")
-            # Stream the converted file in chunks
-            with open(result_p, "rb") as f:
-                while True:
-                    chunk = f.read(8192)
-                    if not chunk:
-                        break
-                    yield chunk
-            logger.info(f"Finished streaming video bytes for: {result_p}")
-        else:
-            e = f"Video conversion failed or produced an \
-                empty file for: {video_fp}"
+        if not (result_p and result_p.exists()
+                and result_p.stat().st_size > 0):
+            e = ("Video conversion failed or produced an "
+                 f"empty file for: {video_fp}")
             logger.error(e)
             raise Exception(e)
-    except Exception as e:
-        logger.error(f"Error in video_conversion_job for {video_fp}: {e}",
-                     exc_info=True)
-        raise e
+        logger.info(f"Converted video to: {result_p} "
+                    f"({os.stat(result_p).st_size} bytes)")
+        return result_p
 
+    @modal.method(is_generator=True)
+    def convert_to_mp4(self,
+                       video_fp: Union[str, Path],
+                       nvenc_preset: str = "p4",
+                       nvenc_tune: str = "hq",
+                       prefetch_chunks: int = STREAM_PREFETCH_CHUNKS
+                       ) -> Generator[bytes, None, None]:
+        """
+        Converts video_fp to MP4 using NVENC and returns the
+        video content as bytes.
+        """
+        logger.info(f"convert_to_mp4 started for video: {video_fp}")
+        outp_local = self.tmp_p / f"{Path(video_fp).stem}_converted.mp4"
+        try:
+            result_p = self._convert(video_fp, outp_local,
+                                     nvenc_preset, nvenc_tune)
+            # Bounded read-ahead keeps memory flat for any file size
+            yield from _prefetch_file(result_p,
+                                      prefetch_chunks=prefetch_chunks)
+            logger.info(f"Finished streaming video bytes for: {result_p}")
+        except Exception as e:
+            logger.error(f"Error in convert_to_mp4 for {video_fp}: {e}",
+                         exc_info=True)
+            raise e
 
-@app.function(
-    gpu="A10G",
-    timeout=600,
-    include_source=True
-)
-def transcribe_to_string_job(audio_fp: Union[str, Path],
-                             ) -> Union[str, None]:
-    logging.basicConfig(level=logging.INFO,
-                        style="{",
-                        format="{levelname}-{name}-{message}"
-                        )
-    fwhisper = FWhisperWrapper()
-    return fwhisper.transcribe_to_str(audio_fp)
+    @modal.method()
+    def convert_to_volume(self,
+                          video_fp: Union[str, Path],
+                          nvenc_preset: str = "p4",
+                          nvenc_tune: str = "hq"
+                          ) -> str:
+        """
+        Converts video_fp to MP4 using NVENC, writing the result straight
+        onto the media Volume. Returns its path on the Volume, for the
+        client to read with `media_volume.read_file`.
+        """
+        logger.info(f"convert_to_volume started for video: {video_fp}")
+        name = f"{Path(video_fp).stem}_converted.mp4"
+        output_p = Path(REMOTE_MEDIA_ROOT) / CONVERTED_DIR / name
+        output_p.parent.mkdir(parents=True, exist_ok=True)
+        try:
+            self._convert(video_fp, output_p, nvenc_preset, nvenc_tune)
+            media_volume.commit()
+            return f"/{CONVERTED_DIR}/{name}"
+        except Exception as e:
+            logger.error(f"Error in convert_to_volume for {video_fp}: {e}",
+                         exc_info=True)
+            raise e
+
+    @modal.method()
+    def transcribe_srt(self,
+                       OPENAI_API_KEY: str,
+                       media_fp: Union[str, Path]
+                       ) -> Union[str, None]:
+        """
+        Runs Whisper transcription on media_fp, fixes with GPT,
+        and returns SRT string.
+        """
+        logger.info(f"transcribe_srt started for media: {media_fp}")
+        media_volume.reload()
+        try:
+            gpt_model_kwargs = {
+                "ApiKey": OPENAI_API_KEY,
+                "from_dotenv": False
+            }
+            srt_result_string = self.fwhisper.transcribe_to_srt(
+                audio_path=str(media_fp),
+                output_path=" ",
+                string_result=True,
+                fix_with_chat_gpt=True,
+                gpt_model_kwargs=gpt_model_kwargs
+                )
+
+            if srt_result_string:
+                logger.info(f"Generated SRT For: {media_fp}")
+                return srt_result_string
+            else:
+                logger.warning(f"SRT Transcription Failed For: {media_fp}")
+                return None
+        except Exception as e:
+            logger.error(f"Error in transcribe_srt for {media_fp}: {e}",
+                         exc_info=True)
+            return None
+
+    @modal.method()
+    def transcribe_to_string(self,
+                             audio_fp: Union[str, Path],
+                             ) -> Union[dict, None]:
+        media_volume.reload()
+        return self.fwhisper.transcribe_to_str(str(audio_fp))
+
+    @modal.method()
+    def transcribe_many_to_string(self,
+                                  audio_fps: List[str]
+                                  ) -> List[Union[dict, None]]:
+        """
+        Transcribe several files in one call on the resident model.
+        """
+        media_volume.reload()
+        return self.fwhisper.transcribe_many_to_str(
+            [str(fp) for fp in audio_fps])
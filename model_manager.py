@@ -0,0 +1,51 @@
+from fastapi import Request
+import logging
+import os
+from typing import Optional, Dict
+
+logger = logging.getLogger(__name__)
+
+# Keyword arguments for the process-wide Whisper model
+WHISPER_KWARGS: Dict = {
+    "backend": os.getenv("WHISPER_BACKEND", "faster-whisper"),
+    # "auto" picks CUDA when a GPU is visible and falls back to CPU
+    "device": os.getenv("WHISPER_DEVICE", "auto"),
+    # VAD chunks decoded per forward pass; 0 disables batched inference
+    "batch_size": int(os.getenv("WHISPER_BATCH_SIZE", "16")) or None,
+}
+WHISPER_MAX_BATCH = int(os.getenv("WHISPER_MAX_BATCH", "8"))
+
+
+def load_fwhisper(**whisper_kwargs):
+    """
+    Load a FWhisperWrapper instance. Imported lazily so that processes
+    which never transcribe don't pay for faster-whisper/CTranslate2.
+    """
+    from processing.whisper_wrapper import get_shared_fwhisper
+    kwargs = {**WHISPER_KWARGS, **whisper_kwargs}
+    logger.info("Loading Whisper model")
+    return get_shared_fwhisper(**kwargs)
+
+
+def make_batcher(fwhisper):
+    """
+    Wrap the shared model in a request-coalescing queue.
+    """
+    from processing.whisper_wrapper import BatchingFWhisper
+    return BatchingFWhisper(fwhisper, max_batch_size=WHISPER_MAX_BATCH)
+
+
+async def get_fwhisper(request: Request):
+    """
+    Returns the Whisper model loaded once in the app's lifespan, or None
+    when transcription runs on Modal.
+    """
+    return getattr(request.app.state, "fwhisper", None)
+
+
+async def get_fwhisper_batcher(request: Request):
+    """
+    Returns the batching queue started in the app's lifespan, or None
+    when transcription runs on Modal.
+    """
+    return getattr(request.app.state, "fwhisper_batcher", None)
@@ -13,5 +13,6 @@ class BreakdownResponse(BaseModel):
     # Pydantic v2 style config
     model_config = ConfigDict(
         populate_by_name=True,
-        extra="ignore"
+        extra="ignore",
+        frozen=True
     )
@@ -1,4 +1,4 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, ConfigDict
 from typing import List
 
 
@@ -8,3 +8,6 @@ class FocusInfo(BaseModel):
     meanings: List[str]
     jlpt: str
     examples: List[str]
+
+    # Shared instances (EMPTY_FOCUS) must not be mutated
+    model_config = ConfigDict(frozen=True)
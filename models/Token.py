@@ -1,4 +1,4 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, ConfigDict
 
 
 class Token(BaseModel):
@@ -6,3 +6,6 @@ class Token(BaseModel):
     lemma: str
     reading: str
     pos: str
+
+    # Built once per tokenized word and never mutated
+    model_config = ConfigDict(frozen=True)
@@ -1,11 +1,42 @@
-from typing import Optional, Union, Dict
+from typing import Optional, Union, Dict, List, Tuple, Any
 from pathlib import Path
-from tempfile import TemporaryDirectory
+from functools import cached_property, lru_cache
 import logging
-from processing.text_processing import SentenceBreakdownService
-from processing.audio_processing import AudioTools
-from dotenv import load_dotenv
-from utils.env_utils import check_env
+import asyncio
+import hashlib
+import secrets
+import threading
+import aiofiles
+from utils.env_utils import check_env, using_modal
+from utils.tmp_utils import new_work_dir
+
+
+# Local media root, mirrored on the Modal media Volume
+MEDIA_ROOT = Path("media_files")
+
+# SentenceBreakdownService instances keyed by (gpt_version, key digest)
+_BREAKDOWN_SERVICES: Dict[Tuple[str, str], Any] = {}
+_BREAKDOWN_LOCK = threading.Lock()
+
+
+def get_breakdown_service(gpt_version: str, api_key: str):
+    """
+    Share one SentenceBreakdownService (Fugashi tagger, Jamdict and the
+    GPT client) between every Processor using the same version and key.
+    """
+    cache_key = (gpt_version,
+                 hashlib.sha256(api_key.encode("utf-8")).hexdigest())
+    service = _BREAKDOWN_SERVICES.get(cache_key)
+    if service is None:
+        with _BREAKDOWN_LOCK:
+            service = _BREAKDOWN_SERVICES.get(cache_key)
+            if service is None:
+                from processing.text_processing import (
+                    SentenceBreakdownService)
+                gpt_kwargs = {"from_dotenv": False, "ApiKey": api_key}
+                service = SentenceBreakdownService(gpt_version, gpt_kwargs)
+                _BREAKDOWN_SERVICES[cache_key] = service
+    return service
 
 
 class Processor:
@@ -19,6 +50,7 @@ class Processor:
         gpt_version: str = "gpt-4.1-mini",
         dotenv_path: Union[str, Path, None] = None,
         whisper_kwargs: Dict = {},
+        fwhisper=None,
         OPENAI_API_KEY: Optional[str] = None,
         MODAL_TOKEN_ID: Optional[str] = None,
         MODAL_TOKEN_SECRET: Optional[str] = None
@@ -29,15 +61,15 @@ class Processor:
         environment variables
         """
         self.logger = logging.getLogger(__class__.__name__)
-        # Configure Save Path
+        # Configure Save Path, defaulting to a dir under the shared
+        # scratch root which is removed at shutdown
         if not save_path:
-            self.save_path = TemporaryDirectory(ignore_cleanup_errors=True)
+            self.save_path = new_work_dir(prefix="processor_")
         else:
             self.save_path = Path(save_path).resolve()
             if not self.save_path.is_dir():
                 raise FileNotFoundError(f"Dir: '{save_path}' does not exist")
-        # Configure API Keys
-        load_dotenv(dotenv_path=dotenv_path)
+        # Configure API Keys (environment is read once, see get_settings)
         if use_modal:
             expected_keys = {"OPENAI_API_KEY": OPENAI_API_KEY,
                              "MODAL_TOKEN_ID": MODAL_TOKEN_ID,
@@ -48,42 +80,60 @@ class Processor:
         self.API_KEYS = check_env(expected_keys.keys(),
                                   expected_keys,
                                   dotenv_path)
-        # Initializing Instances
-        gpt_kwargs = {"from_dotenv": False,
-                      "ApiKey": self.API_KEYS["OPENAI_API_KEY"]}
-        self.sentence_breakdown_service = SentenceBreakdownService(gpt_version,
-                                                                   gpt_kwargs)
-        if not save_path:
-            self.audio_tools = AudioTools(self.save_path.name)
-        else:
-            self.audio_tools = AudioTools(self.save_path)
-        if use_modal:
-            from modal_processing.ModalApp import (app,
-                                                   transcribe_srt_job,
-                                                   transcribe_to_string_job,
-                                                   video_conversion_job
-                                                   )
-            self.modal_app = app
-            self.transcribe_srt_job = transcribe_srt_job
-            self.transcribe_to_string_job = transcribe_to_string_job
-            self.video_conversion_job = video_conversion_job
-        else:
-            from processing.whisper_wrapper import FWhisperWrapper
-            self.fwhisper = FWhisperWrapper(**whisper_kwargs)
+        # Heavy services (Fugashi/Jamdict, FFmpeg, Whisper, the Modal
+        # client) are built lazily on first access, see the cached
+        # properties below.
         # Save attrs
         self.save_path_input = save_path
         self.use_modal = use_modal
         self.gpt_version = gpt_version
         self.dotenv_path = dotenv_path
         self.whisper_kwargs = whisper_kwargs
+        self._fwhisper = fwhisper
         self.openai_key_input = OPENAI_API_KEY
         self.modal_token_id_input = MODAL_TOKEN_ID
         self.modal_token_secret_input = MODAL_TOKEN_SECRET
         self.logger.info("Processor Initialized")
 
+    @cached_property
+    def sentence_breakdown_service(self):
+        return get_breakdown_service(self.gpt_version,
+                                     self.API_KEYS["OPENAI_API_KEY"])
+
+    @cached_property
+    def _modal(self):
+        # Look up the deployed app (`modal deploy
+        # modal_processing/ModalApp.py`) so calls land on its warm
+        # containers instead of starting an ephemeral app each time
+        import modal
+        from modal_processing.ModalApp import (APP_NAME,
+                                               WORKER_CLS_NAME,
+                                               media_volume)
+        worker_cls = modal.Cls.from_name(APP_NAME, WORKER_CLS_NAME)
+        return worker_cls(), media_volume
+
+    @property
+    def gpu_worker(self):
+        return self._modal[0]
+
+    @property
+    def media_volume(self):
+        return self._modal[1]
+
+    @cached_property
+    def audio_tools(self):
+        from processing.audio_processing import AudioTools
+        return AudioTools(self.save_path)
+
+    @cached_property
+    def fwhisper(self):
+        # Prefer the shared model injected by the caller
+        if self._fwhisper is not None:
+            return self._fwhisper
+        from processing.whisper_wrapper import get_shared_fwhisper
+        return get_shared_fwhisper(**self.whisper_kwargs)
+
     def __str__(self):
-        if isinstance(self.save_path, TemporaryDirectory):
-            return str(Path(self.save_path.name).resolve())
         return str(Path(self.save_path).resolve())
 
     def __repr__(self):
@@ -100,40 +150,113 @@ class Processor:
         arg_s = ','.join([f"{k}={v}" for k, v in args.items()])
         return f"Processor({arg_s})"
 
-    def __del__(self):
-        if isinstance(self.save_path, TemporaryDirectory):
-            self.save_path.cleanup()
+    def _volume_path(self, fp: Union[str, Path]) -> str:
+        """
+        Path of a local media file relative to media_files, which is
+        where it lives on the Modal Volume. Files from elsewhere get a
+        unique staging name, so concurrent uploads sharing a file name
+        don't overwrite (or unstage) each other.
+        """
+        p = Path(fp).resolve()
+        try:
+            return p.relative_to(MEDIA_ROOT.resolve()).as_posix()
+        except ValueError:
+            return f"staging/{secrets.token_hex(8)}_{p.name}"
+
+    async def _stage(self, fp: Union[str, Path]) -> str:
+        """
+        Upload a local file to the media Volume and return the path the
+        Modal container should open; pass it to `_unstage` afterwards.
+        """
+        rel = self._volume_path(fp)
+
+        def upload():
+            with self.media_volume.batch_upload(force=True) as batch:
+                batch.put_file(str(fp), f"/{rel}")
+
+        await asyncio.to_thread(upload)
+        return f"media_files/{rel}"
+
+    async def _remove_volume_file(self, vol_path: str) -> None:
+        try:
+            await asyncio.to_thread(self.media_volume.remove_file, vol_path)
+        except Exception as e:
+            self.logger.warning(f"Could not remove {vol_path} "
+                                f"from Volume: {e}")
+
+    async def _unstage(self, remote_fp: str) -> None:
+        """
+        Remove a file staged by `_stage`, given the path it returned.
+        """
+        rel = remote_fp.removeprefix("media_files/")
+        await self._remove_volume_file(f"/{rel}")
 
     async def modal_transcribe_to_srt(self,
                                       media_fp: Union[str, Path]
                                       ) -> Union[str, None]:
-        async with self.modal_app.run():
-            media_fp = Path(media_fp).as_posix()
-            return await self.transcribe_srt_job.remote.aio(
+        remote_fp = await self._stage(media_fp)
+        try:
+            return await self.gpu_worker.transcribe_srt.remote.aio(
                 OPENAI_API_KEY=self.API_KEYS["OPENAI_API_KEY"],
-                media_fp=media_fp)
+                media_fp=remote_fp)
+        finally:
+            await self._unstage(remote_fp)
 
     async def modal_transcribe_to_str(self,
                                       audio_fp: Union[str, Path]
                                       ) -> Union[str, None]:
-        with self.modal_app.run():
-            audio_fp = Path(audio_fp).as_posix()
-            return self.transcribe_to_string_job.remote(audio_fp=audio_fp)
+        remote_fp = await self._stage(audio_fp)
+        try:
+            return await self.gpu_worker.transcribe_to_string.remote.aio(
+                audio_fp=remote_fp)
+        finally:
+            await self._unstage(remote_fp)
+
+    async def modal_transcribe_many_to_str(self,
+                                           audio_fps: List[Union[str, Path]]
+                                           ) -> List[Union[Dict, None]]:
+        """
+        Fan several files out over warm Modal containers with `.map`,
+        each container reusing its resident model.
+        """
+        paths = [await self._stage(fp) for fp in audio_fps]
+        try:
+            return [r async for r in
+                    self.gpu_worker.transcribe_to_string.map.aio(paths)]
+        finally:
+            for remote_fp in paths:
+                await self._unstage(remote_fp)
 
     async def modal_convert_to_mp4(self,
                                    video_fp: Union[str, Path],
                                    outpath: Union[str, Path]
                                    ):
-        with self.modal_app.run():
-            video_fp = Path(video_fp).as_posix()
-            outpath = Path(outpath).as_posix()
-            try:
-                async for chunk in self.video_conversion_job.remote_gen.aio(
-                       video_fp=video_fp):
-                    with open(outpath, "ab") as f_out:
-                        f_out.write(chunk)
-                self.logger.info("Finished receiving converted video")
-                return Path(outpath)
-            except Exception as e:
-                self.logger.error(f"Error Converting Video: {e}")
-                return None
+        remote_fp = await self._stage(video_fp)
+        outpath = Path(outpath).as_posix()
+        vol_path = None
+        try:
+            # The result stays on the Volume instead of travelling back
+            # as one bytes payload; read_file streams it in blocks
+            vol_path = await self.gpu_worker.convert_to_volume.remote.aio(
+                video_fp=remote_fp)
+            async with aiofiles.open(outpath, "wb") as f_out:
+                async for chunk in self.media_volume.read_file.aio(vol_path):
+                    await f_out.write(chunk)
+            self.logger.info("Finished receiving converted video")
+            return Path(outpath)
+        except Exception as e:
+            self.logger.error(f"Error Converting Video: {e}")
+            return None
+        finally:
+            await self._unstage(remote_fp)
+            if vol_path:
+                await self._remove_volume_file(vol_path)
+
+
+@lru_cache(maxsize=1)
+def get_processor() -> Processor:
+    """
+    Process-wide default Processor shared by the routers, so its
+    scratch dir and lazily built services exist once.
+    """
+    return Processor(use_modal=using_modal())
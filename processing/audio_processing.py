@@ -1,9 +1,42 @@
+import asyncio
+import json
+import os
 import subprocess
 import shutil
 import pathlib
+import tempfile
 from typing import Union
 import logging
-from datetime import datetime
+from functools import cached_property, lru_cache
+
+# Fragmented MP4: the moov box is written up front, so there is no
+# +faststart pass re-reading and rewriting the finished file
+MP4_MOVFLAGS = "+frag_keyframe+empty_moov+default_base_moof"
+
+# CPUs this process may actually run on (respects affinity/cpusets,
+# unlike os.cpu_count())
+_NTHREADS = str(len(os.sched_getaffinity(0))
+                if hasattr(os, "sched_getaffinity") else os.cpu_count() or 1)
+# Thread flags for the libx264 path and its filter graph
+CPU_THREAD_ARGS = ["-threads", _NTHREADS,
+                   "-filter_threads", _NTHREADS,
+                   "-filter_complex_threads", _NTHREADS]
+
+
+def _bitrate_bps(bitrate: str) -> int:
+    """
+    FFmpeg-style bitrate ('2500k', '4M', '800000') in bits per second.
+    """
+    b = bitrate.strip().lower()
+    scale = {"k": 1_000, "m": 1_000_000}.get(b[-1:], 1)
+    return int(float(b[:-1] if scale != 1 else b) * scale)
+
+
+def _decode(output: Union[bytes, None]) -> str:
+    """
+    Decode captured subprocess output, tolerating invalid UTF-8.
+    """
+    return output.decode("utf-8", errors="replace") if output else ""
 
 
 class AudioTools:
@@ -35,6 +68,48 @@ class AudioTools:
             raise EnvironmentError("FFprobe not found.")
         self.logger.debug(f"FFMPEG at : {self.ffmpeg}")
 
+    def _probe_list(self, flag: str) -> set[str]:
+        """
+        First word of each line printed by `ffmpeg <flag>`, used to check
+        which hwaccels / filters / encoders this build supports.
+        """
+        result = self.run_command([self.ffmpeg, "-hide_banner", flag],
+                                  capture_output=True)
+        if result is None or result.returncode != 0:
+            return set()
+        names = set()
+        for line in _decode(result.stdout).splitlines():
+            parts = line.split()
+            if parts:
+                names.add(parts[0])
+                # `-filters` lines are "<flags> <name> <io> <description>"
+                if len(parts) > 1:
+                    names.add(parts[1])
+        return names
+
+    @cached_property
+    def hwaccels(self) -> set[str]:
+        return self._probe_list("-hwaccels")
+
+    @cached_property
+    def filters(self) -> set[str]:
+        return self._probe_list("-filters")
+
+    @cached_property
+    def encoders(self) -> set[str]:
+        return self._probe_list("-encoders")
+
+    @property
+    def nvenc_available(self) -> bool:
+        return "h264_nvenc" in self.encoders
+
+    @property
+    def can_cuda_decode(self) -> bool:
+        """
+        True when FFmpeg can decode with NVDEC and scale on the GPU.
+        """
+        return "cuda" in self.hwaccels and "scale_cuda" in self.filters
+
     def run_command(self,
                     command: list[str],
                     capture_output: bool = False,
@@ -47,6 +122,9 @@ class AudioTools:
         Simple wrapper for subprocess execution which returns a completed
         subprocess instance in case of sucess or returns None and logs error
         in case of failed subprocess execution.
+
+        Output is captured as raw bytes; FFmpeg's progress chatter is only
+        decoded when it is actually logged (see `_decode`).
         """
         self.logger.debug(f"Running Command: {' '.join(command)}")
 
@@ -56,33 +134,83 @@ class AudioTools:
                                         check=check,
                                         stdout=subprocess.DEVNULL,
                                         stderr=subprocess.PIPE,
-                                        text=True,
                                         cwd=cwd)
             else:
                 result = subprocess.run(command,
                                         check=check,
                                         capture_output=capture_output,
-                                        text=True,
                                         cwd=cwd)
 
-            if capture_output:
-                self.logger.debug(f"STDOUT: {result.stdout}")
-                self.logger.debug(f"STDERR: {result.stderr}")
+            if capture_output and self.logger.isEnabledFor(logging.DEBUG):
+                self.logger.debug(f"STDOUT: {_decode(result.stdout)}")
+                self.logger.debug(f"STDERR: {_decode(result.stderr)}")
 
             return result
 
         except subprocess.CalledProcessError as e:
             self.logger.error(f"Command Failed: {' '.join(command)}")
+            # Logged rather than written to a file in working_dir: one
+            # AudioTools serves concurrent requests, whose failures
+            # would overwrite each other's log file
             if capture_output:
-                self.logger.error(f"STDOUT: {e.stdout}")
-                self.logger.error(f"STDERR: {e.stderr}")
-                error_message = e.stderr.decode()
-                timestamp = datetime.now().strftime("[%Y-%m-%d %H:%M:%S]")
-                with open(self.working_dir / "error_log.txt",
-                          "w", encoding="utf-8") as log_file:
-                    log_file.write(
-                        f"{timestamp} FFmpeg error:\n{error_message}\n\n")
+                self.logger.error(f"STDOUT: {_decode(e.stdout)}")
+                self.logger.error(f"STDERR: {_decode(e.stderr)}")
+            return None
+
+    async def run_command_async(self,
+                                command: list[str],
+                                capture_output: bool = False
+                                ) -> Union[subprocess.CompletedProcess,
+                                           None]:
+        """
+        Non-blocking counterpart of run_command: the event loop keeps
+        serving while FFmpeg runs, and independent passes can be awaited
+        together. stderr is always captured (as bytes) so failures can be
+        logged.
+        """
+        self.logger.debug(f"Running Command: {' '.join(command)}")
+        try:
+            proc = await asyncio.create_subprocess_exec(
+                *command,
+                stdout=(asyncio.subprocess.PIPE if capture_output
+                        else asyncio.subprocess.DEVNULL),
+                stderr=asyncio.subprocess.PIPE)
+            stdout, stderr = await proc.communicate()
+        except OSError as e:
+            self.logger.error(f"Command Failed: {' '.join(command)}: {e}")
             return None
+        result = subprocess.CompletedProcess(command, proc.returncode,
+                                             stdout or b"", stderr or b"")
+        if result.returncode != 0:
+            self.logger.error(f"Command Failed: {' '.join(command)}")
+            self.logger.error(f"STDERR: {_decode(result.stderr)}")
+        return result
+
+    def probe_streams(self, path: pathlib.Path) -> dict[str, dict]:
+        """
+        ffprobe the first video and audio stream of `path`.
+
+        Returns:
+            {"video": {...}, "audio": {...}} with whichever streams exist,
+            or {} if ffprobe fails.
+        """
+        result = self.run_command([
+            self.ffprobe, "-v", "error",
+            "-show_entries",
+            "stream=codec_type,codec_name,pix_fmt,width,height,"
+            "sample_rate,channels",
+            "-of", "json", path.as_posix()
+        ], capture_output=True)
+        if result is None or result.returncode != 0:
+            return {}
+        try:
+            streams = json.loads(result.stdout).get("streams", [])
+        except ValueError:
+            return {}
+        found = {}
+        for stream in streams:
+            found.setdefault(stream.get("codec_type"), stream)
+        return found
 
     def to_wav(self,
                input_path: str,
@@ -90,6 +218,15 @@ class AudioTools:
 
         ip = pathlib.Path(input_path).resolve()
         op = pathlib.Path(output_path or ip.with_suffix(".wav")).resolve()
+        if ip.suffix.lower() == ".wav":
+            audio = self.probe_streams(ip).get("audio", {})
+            if (audio.get("codec_name", "").startswith("pcm_")
+                    and str(audio.get("sample_rate")) == "44100"
+                    and audio.get("channels") == 2):
+                # Already in the target format: no decode/encode pass
+                if op != ip:
+                    shutil.copyfile(ip, op)
+                return op
         s = ip.as_posix()
         so = op.as_posix()
 
@@ -106,67 +243,264 @@ class AudioTools:
                          hide_and_log=True)
         return op
 
-    def extract_audio(self, input_path: str) -> str:
+    def _extract_audio_cmd(self, input_path: str):
         """
-        If input is a video container, extract to a temp WAV.
-        Otherwise return the original path.
+        FFmpeg command and output path for extract_audio, or None when
+        the input already is an audio file.
         """
         ext = pathlib.Path(input_path).resolve().suffix
         audio_exts = {".wav", ".mp3", ".m4a", ".flac", ".aac"}
         if ext in audio_exts:
             self.logger.debug("Input is audio (%s), no extraction needed", ext)
-            return input_path
+            return None
 
         self.logger.info("Extracting audio from video container %s",
                          input_path)
         out = pathlib.Path(input_path).resolve().with_suffix(".wav")
-        si = pathlib.Path(input_path).resolve().as_posix()
-        so = out.as_posix()
-        cmd = [
-            self.ffmpeg, "-y", "-i", si,
-            "-vn", "-acodec", "pcm_s16le",
-            "-ar", "16000", "-ac", "1", so
-        ]
+        cmd = self._filter_audio_cmd(input_path, out, skip_filters=True,
+                                     hwaccel=self.can_cuda_decode)
+        return cmd, out
+
+    def extract_audio(self, input_path: str) -> str:
+        """
+        If input is a video container, extract to a temp WAV.
+        Otherwise return the original path.
+
+        Equivalent to filter_audio(skip_filters=True) next to the input;
+        prefer filter_audio directly when the audio will be cleaned.
+        """
+        prepared = self._extract_audio_cmd(input_path)
+        if prepared is None:
+            return input_path
+        cmd, out = prepared
         self.run_command(cmd,
                          hide_and_log=True)
-        self.logger.debug(f"Audio Saved at {so}")
+        self.logger.debug(f"Audio Saved at {out}")
+        return out
+
+    async def extract_audio_async(self, input_path: str) -> str:
+        """
+        extract_audio without blocking the event loop.
+        """
+        prepared = self._extract_audio_cmd(input_path)
+        if prepared is None:
+            return input_path
+        cmd, out = prepared
+        await self.run_command_async(cmd)
+        self.logger.debug(f"Audio Saved at {out}")
         return out
 
+    def _filter_audio_cmd(self,
+                          input_path: str,
+                          output_wav: str,
+                          highpass: int = 300,
+                          lowpass: int = 3400,
+                          skip_filters: bool = False,
+                          hwaccel: bool = False) -> list[str]:
+        i = pathlib.Path(input_path).resolve().as_posix()
+        o = pathlib.Path(output_wav).resolve().as_posix()
+        # dynaudnorm is a single cheap pass; loudnorm's EBU R128
+        # analysis ran at only ~30x realtime
+        af = ("anull" if skip_filters else
+              f"highpass=f={highpass},lowpass=f={lowpass},"
+              "dynaudnorm=f=250:g=15")
+        # -hwaccel auto falls back to software decoding on its own
+        hw = ["-hwaccel", "auto"] if hwaccel else []
+        return [
+            self.ffmpeg,
+            "-y",
+            *hw,
+            "-i", i,
+            "-vn",
+            "-af", af,
+            "-acodec", "pcm_s16le",
+            "-ac", "1",
+            "-ar", "16000",
+            o
+        ]
+
     def filter_audio(self,
                      input_path: str,
                      output_wav: str,
                      highpass: int = 300,
-                     lowpass: int = 3400) -> str:
+                     lowpass: int = 3400,
+                     skip_filters: bool = False) -> str:
         """
         Extracts audio from video or uses an existing audio file,
-        applies a band-pass (highpass→lowpass) and loudness normalization,
-        then writes out a 16 kHz mono WAV ready for Whisper.
+        applies a band-pass (highpass→lowpass) and dynamic normalization,
+        then writes out a 16 kHz mono WAV ready for Whisper. Demuxing,
+        decoding and filtering happen in one FFmpeg pass, so there is no
+        need to call extract_audio first.
 
         Args:
         input_path:   Path to video (any container) or audio file.
         output_wav:   Path where the cleaned WAV will be saved.
         highpass:     Cut everything below this frequency (Hz).
         lowpass:      Cut everything above this frequency (Hz).
+        skip_filters: Only resample to 16 kHz mono, no filtering.
 
         Returns:
         The output_wav path, for chaining into Whisper.
         """
-        i = pathlib.Path(input_path).resolve().as_posix()
-        o = pathlib.Path(output_wav).resolve().as_posix()
-        cmd = [
-            self.ffmpeg,
-            "-y",
-            "-i", i,
-            "-vn",
-            "-af",
-            f"highpass=f={highpass}, lowpass=f={lowpass}, loudnorm",
-            "-ac", "1",
-            "-ar", "16000",
-            o
-        ]
+        cmd = self._filter_audio_cmd(input_path, output_wav,
+                                     highpass, lowpass, skip_filters)
         self.run_command(cmd, hide_and_log=True)
         return output_wav
 
+    async def filter_audio_async(self,
+                                 input_path: str,
+                                 output_wav: str,
+                                 highpass: int = 300,
+                                 lowpass: int = 3400,
+                                 skip_filters: bool = False) -> str:
+        """
+        filter_audio without blocking the event loop.
+        """
+        cmd = self._filter_audio_cmd(input_path, output_wav,
+                                     highpass, lowpass, skip_filters)
+        await self.run_command_async(cmd)
+        return output_wav
+
+    def _to_mp4_pynvc(self,
+                      src: pathlib.Path,
+                      dst: pathlib.Path,
+                      w: int,
+                      h: int,
+                      target_bitrate: str,
+                      audio_args: list[str]) -> pathlib.Path | None:
+        """
+        Transcode the video stream entirely on the GPU with PyNvVideoCodec
+        (NVDEC surfaces fed straight to NVENC, no host round trip) and use
+        FFmpeg only to carry the audio over and mux the MP4.
+
+        Returns None when PyNvVideoCodec is unavailable, the source is
+        not already `w`x`h` (there is no GPU scale/pad here, and the
+        output must match the FFmpeg path's canvas), the decoder doesn't
+        hand out NV12 surfaces (e.g. 10-bit sources), or anything fails,
+        so the caller can fall back to FFmpeg.
+        """
+        try:
+            import PyNvVideoCodec as nvc
+        except ImportError:
+            self.logger.debug("PyNvVideoCodec not installed")
+            return None
+
+        # Unique per call: the shared AudioTools may convert two uploads
+        # with the same file name at once
+        work = pathlib.Path(tempfile.mkdtemp(dir=self.temp, prefix="pynvc_"))
+        video_es = work / "video.h264"
+        try:
+            demuxer = nvc.CreateDemuxer(filename=src.as_posix())
+            width, height = demuxer.Width(), demuxer.Height()
+            if (width, height) != (w, h):
+                self.logger.info("PyNvVideoCodec: %dx%d is not %dx%d, "
+                                 "using FFmpeg", width, height, w, h)
+                return None
+            fps = demuxer.FrameRate()
+            decoder = nvc.CreateDecoder(gpuid=0,
+                                        codec=demuxer.GetNvCodecId(),
+                                        cudacontext=0,
+                                        cudastream=0,
+                                        usedevicememory=True)
+            encoder = nvc.CreateEncoder(width, height, "NV12", False,
+                                        codec="h264",
+                                        preset="P4",
+                                        tuning_info="high_quality",
+                                        # Options go in as strings, like fps
+                                        bitrate=str(_bitrate_bps(
+                                            target_bitrate)),
+                                        fps=str(int(round(fps))))
+            checked = False
+            with open(video_es, "wb") as f:
+                for packet in demuxer:
+                    for frame in decoder.Decode(packet):
+                        if not checked:
+                            # The encoder was created for NV12 input
+                            fmt = getattr(frame, "format", None)
+                            if "NV12" not in str(fmt):
+                                self.logger.info("PyNvVideoCodec: decoded "
+                                                 "%s surfaces, using FFmpeg",
+                                                 fmt)
+                                return None
+                            checked = True
+                        bitstream = encoder.Encode(frame)
+                        if bitstream:
+                            f.write(bytearray(bitstream))
+                bitstream = encoder.EndEncode()
+                if bitstream:
+                    f.write(bytearray(bitstream))
+
+            # One FFmpeg pass: copy the GPU bitstream, take the audio (if
+            # any) straight from the source
+            mux = [self.ffmpeg, "-y",
+                   "-r", f"{fps}", "-i", video_es.as_posix(),
+                   "-i", src.as_posix(),
+                   "-map", "0:v", "-map", "1:a?",
+                   "-c:v", "copy",
+                   *audio_args,
+                   "-movflags", MP4_MOVFLAGS, dst.as_posix()]
+            result = self.run_command(mux, capture_output=True,
+                                      hide_and_log=True)
+            if result is None or result.returncode != 0:
+                return None
+            self.logger.info("Converted %s → %s with PyNvVideoCodec",
+                             src.name, dst.name)
+            return dst
+        except Exception as e:
+            self.logger.warning(f"PyNvVideoCodec transcode failed: {e}")
+            return None
+        finally:
+            shutil.rmtree(work, ignore_errors=True)
+
+    def _audio_args(self, audio: dict | None) -> list[str]:
+        """
+        Audio codec arguments for an MP4 output: keep AAC sources as-is,
+        otherwise prefer Fraunhofer AAC.
+        """
+        if audio is not None and audio.get("codec_name") == "aac":
+            return ["-c:a", "copy"]
+        aac = "libfdk_aac" if "libfdk_aac" in self.encoders else "aac"
+        return ["-c:a", aac, "-b:a", "128k"]
+
+    @staticmethod
+    def _video_enc_args(use_nvenc: bool,
+                        target_bitrate: str,
+                        nvenc_preset: str = "p4",
+                        nvenc_tune: str = "hq",
+                        nvenc_rc: str = "vbr",
+                        nvenc_cq: int = 23,
+                        low_latency: bool = False) -> list[str]:
+        """
+        H.264 encoder arguments shared by to_mp4 and batch_to_mp4.
+        """
+        if not use_nvenc:
+            # Favour speed; -b:v alone sets the rate control
+            return [
+                "-c:v", "libx264",
+                "-profile:v", "high",
+                "-b:v", target_bitrate,
+                "-preset", "ultrafast",
+                "-tune", "zerolatency",
+                *CPU_THREAD_ARGS,
+                "-pix_fmt", "yuv420p",
+            ]
+        enc_args = [
+            "-c:v", "h264_nvenc",
+            "-preset", nvenc_preset,
+            "-tune", nvenc_tune,
+            "-rc:v", nvenc_rc,
+            "-cq", str(nvenc_cq),
+            "-b:v", target_bitrate,
+            "-b_ref_mode", "middle",
+            "-bf", "2",
+            "-pix_fmt", "yuv420p",
+        ]
+        if low_latency:
+            enc_args += ["-spatial_aq", "0",
+                         "-temporal_aq", "0",
+                         "-rc-lookahead", "0"]
+        return enc_args
+
     def to_mp4(
         self,
         input_path: str,
@@ -174,6 +508,12 @@ class AudioTools:
         resolution: str = "1280x720",
         target_bitrate: str = "2500k",
         use_nvenc: bool = False,
+        use_pynvc: bool = False,
+        nvenc_preset: str = "p4",
+        nvenc_tune: str = "hq",
+        nvenc_rc: str = "vbr",
+        nvenc_cq: int = 23,
+        low_latency: bool = False,
     ) -> pathlib.Path | None:
         """
         Convert any video to MP4 (H.264 + AAC) that streams well in <video>.
@@ -184,6 +524,13 @@ class AudioTools:
             resolution:      Target canvas WxH. Aspect is preserved.
             target_bitrate:  Video bitrate (e.g. '2500k').
             use_nvenc:       True → try NVIDIA NVENC; False → libx264 CPU.
+            use_pynvc:       True → try a GPU-only PyNvVideoCodec transcode
+                             first, falling back to FFmpeg.
+            nvenc_preset:    NVENC preset p1 (fastest) … p7 (best).
+            nvenc_tune:      NVENC tuning: hq, ll, ull or lossless.
+            nvenc_rc:        NVENC rate control mode.
+            nvenc_cq:        Constant-quality target for NVENC VBR.
+            low_latency:     Disable AQ and lookahead for lowest latency.
 
         Returns:
             pathlib.Path of the MP4, or None on failure.
@@ -202,39 +549,59 @@ class AudioTools:
                               resolution)
             return None
 
+        streams = self.probe_streams(src)
+        video, audio = streams.get("video", {}), streams.get("audio")
+        if (video.get("codec_name") == "h264"
+                and video.get("pix_fmt") == "yuv420p"
+                and (video.get("width"), video.get("height")) == (w, h)
+                and (audio is None or audio.get("codec_name") == "aac")):
+            # Already browser-ready at the target size: remux only
+            result = self.run_command([
+                self.ffmpeg, "-y", "-i", src.as_posix(),
+                "-map", "0:v:0", "-map", "0:a:0?",
+                "-c", "copy",
+                "-movflags", MP4_MOVFLAGS,
+                dst.as_posix()
+            ], capture_output=True, hide_and_log=True)
+            if result is not None and result.returncode == 0:
+                self.logger.info("Remuxed %s → %s without re-encoding",
+                                 src.name, dst.name)
+                return dst
+
+        if use_nvenc and not self.nvenc_available:
+            # Skip the GPU attempt instead of paying for a failed transcode
+            self.logger.info("h264_nvenc not available, encoding on CPU")
+            use_nvenc = False
+
+        audio_args = self._audio_args(audio)
+
+        if use_pynvc:
+            out = self._to_mp4_pynvc(src, dst, w, h, target_bitrate,
+                                     audio_args)
+            if out is not None:
+                return out
+
         # 1) scale to fit, 2) pad to canvas (center)
         vf = (
             f"scale=w={w}:h={h}:force_original_aspect_ratio=decrease,"
             f"pad=w={w}:h={h}:x=(ow-iw)/2:y=(oh-ih)/2:color=black"
         )
-        cpu_enc = [
-                "-c:v", "libx264",
-                "-profile:v", "high",
-                "-b:v", target_bitrate,
-                "-preset", "veryfast",
-                "-crf", "23",
-                "-pix_fmt", "yuv420p",
-            ]
+        cpu_enc = self._video_enc_args(False, target_bitrate)
         cpu_cmd = [
             self.ffmpeg, "-y",
             "-i", src.as_posix(),
             "-vf", vf,
             *cpu_enc,
-            "-c:a", "aac",
-            "-b:a", "128k",
-            "-movflags", "+faststart",
+            *audio_args,
+            "-movflags", MP4_MOVFLAGS,
             dst.as_posix(),
         ]
 
         # ---------- choose encoder ----------
         if use_nvenc:
-            enc_args = [
-                "-c:v", "h264_nvenc",
-                "-preset", "p6",           # quality-speed sweet spot
-                "-rc:v", "vbr",
-                "-b:v", target_bitrate,
-                "-pix_fmt", "yuv420p",
-            ]
+            enc_args = self._video_enc_args(True, target_bitrate,
+                                            nvenc_preset, nvenc_tune,
+                                            nvenc_rc, nvenc_cq, low_latency)
         else:
             enc_args = cpu_enc
 
@@ -243,21 +610,142 @@ class AudioTools:
             "-i", src.as_posix(),
             "-vf", vf,
             *enc_args,
-            "-c:a", "aac",
-            "-b:a", "128k",
-            "-movflags", "+faststart",
+            *audio_args,
+            "-movflags", MP4_MOVFLAGS,
             dst.as_posix(),
         ]
+        attempts = [cmd]
 
-        result = self.run_command(cmd, capture_output=True, hide_and_log=True)
+        # NVDEC → scale_cuda → NVENC keeps frames in GPU memory
+        if use_nvenc and self.can_cuda_decode:
+            gpu_vf = (f"scale_cuda=w={w}:h={h}:format=yuv420p:"
+                      "force_original_aspect_ratio=decrease")
+            gpu_enc = [a for a in enc_args if a not in ("-pix_fmt",
+                                                        "yuv420p")]
+            if "pad_cuda" in self.filters:
+                gpu_vf += (f",pad_cuda=w={w}:h={h}:"
+                           "x=(ow-iw)/2:y=(oh-ih)/2")
+            else:
+                # Only the padding runs on the CPU, on the scaled frame
+                gpu_vf += (",hwdownload,format=yuv420p,"
+                           f"pad=w={w}:h={h}:x=(ow-iw)/2:y=(oh-ih)/2:"
+                           "color=black")
+                gpu_enc += ["-pix_fmt", "yuv420p"]
+            attempts.insert(0, [
+                self.ffmpeg, "-y",
+                "-hwaccel", "cuda",
+                "-hwaccel_output_format", "cuda",
+                "-i", src.as_posix(),
+                "-vf", gpu_vf,
+                *gpu_enc,
+                *audio_args,
+                "-movflags", MP4_MOVFLAGS,
+                dst.as_posix(),
+            ])
         # Retry with normal args in case of NVENC error
-        if result.returncode != 0 and use_nvenc:
-            result = self.run_command(cpu_cmd,
+        if use_nvenc:
+            attempts.append(cpu_cmd)
+
+        for attempt in attempts:
+            result = self.run_command(attempt,
                                       capture_output=True,
                                       hide_and_log=True)
+            if result is not None and result.returncode == 0:
+                break
         if result is None or result.returncode != 0:
-            self.logger.error("FFmpeg to_mp4 failed:\n%s", result.stderr)
+            self.logger.error("FFmpeg to_mp4 failed:\n%s",
+                              _decode(result.stderr) if result else "")
             return None
 
         self.logger.info("Converted %s → %s", src.name, dst.name)
         return dst
+
+    async def to_mp4_async(self, input_path: str,
+                           **kwargs) -> pathlib.Path | None:
+        """
+        to_mp4 off the event loop. The NVDEC/NVENC/x264 fallback chain
+        runs several FFmpeg attempts in sequence, so it stays on a worker
+        thread; it can still be awaited alongside extract_audio_async.
+        """
+        return await asyncio.to_thread(self.to_mp4, input_path, **kwargs)
+
+    def batch_to_mp4(
+        self,
+        inputs: list[tuple[str, str]],
+        resolution: str = "1280x720",
+        target_bitrate: str = "2500k",
+        use_nvenc: bool = False,
+    ) -> list[pathlib.Path | None]:
+        """
+        Convert several videos with one FFmpeg process, so process start
+        and encoder initialisation are paid once for the whole batch.
+
+        Args:
+            inputs:          (input_path, output_path) pairs.
+            resolution:      Target canvas WxH. Aspect is preserved.
+            target_bitrate:  Video bitrate (e.g. '2500k').
+            use_nvenc:       True → NVIDIA NVENC; False → libx264 CPU.
+
+        Returns:
+            One entry per input: the MP4 path, or None on failure. If the
+            batched run fails every clip is retried through to_mp4.
+        """
+        if not inputs:
+            return []
+        try:
+            w, h = map(int, resolution.lower().split("x"))
+        except ValueError:
+            self.logger.error("batch_to_mp4: resolution must be 'WxH', "
+                              "got %s", resolution)
+            return [None] * len(inputs)
+
+        srcs = [pathlib.Path(i).resolve() for i, _ in inputs]
+        dsts = [pathlib.Path(o).resolve() for _, o in inputs]
+        if not all(src.is_file() for src in srcs):
+            self.logger.error("batch_to_mp4: missing input file")
+            return [None] * len(inputs)
+
+        # Same encoder settings as a single to_mp4 conversion
+        enc_args = self._video_enc_args(use_nvenc and self.nvenc_available,
+                                        target_bitrate)
+
+        cmd = [self.ffmpeg, "-y"]
+        for src in srcs:
+            cmd += ["-i", src.as_posix()]
+        graph = ";".join(
+            f"[{n}:v]scale=w={w}:h={h}:force_original_aspect_ratio=decrease,"
+            f"pad=w={w}:h={h}:x=(ow-iw)/2:y=(oh-ih)/2:color=black[v{n}]"
+            for n in range(len(srcs)))
+        cmd += ["-filter_complex", graph]
+        for n, (src, dst) in enumerate(zip(srcs, dsts)):
+            cmd += ["-map", f"[v{n}]", "-map", f"{n}:a?",
+                    *enc_args,
+                    *self._audio_args(self.probe_streams(src).get("audio")),
+                    "-movflags", MP4_MOVFLAGS,
+                    dst.as_posix()]
+
+        result = self.run_command(cmd, capture_output=True, hide_and_log=True)
+        if result is not None and result.returncode == 0:
+            self.logger.info("Converted %d videos in one FFmpeg run",
+                             len(srcs))
+            return dsts
+
+        self.logger.warning("Batched conversion failed, converting "
+                            "clips one at a time")
+        return [self.to_mp4(input_path=src.as_posix(),
+                            output_path=dst.as_posix(),
+                            resolution=resolution,
+                            target_bitrate=target_bitrate,
+                            use_nvenc=use_nvenc)
+                for src, dst in zip(srcs, dsts)]
+
+
+@lru_cache(maxsize=1)
+def get_audio_tools() -> AudioTools:
+    """
+    Process-wide AudioTools rooted at the scratch directory. Outputs are
+    derived from the paths passed to each call, so one instance serves
+    every request without repeating the ffmpeg/ffprobe PATH lookups.
+    """
+    from utils.tmp_utils import tmp_root
+    return AudioTools(working_dir=tmp_root())
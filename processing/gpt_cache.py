@@ -0,0 +1,337 @@
+import hashlib
+import logging
+import os
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+DATA_DIR = Path(__file__).resolve().parent.parent / "data"
+CACHE_DB_PATH = DATA_DIR / "gpt_cache.db"
+INDEX_PATH = DATA_DIR / "gpt_cache_index.npz"
+EMBED_MODEL = "text-embedding-3-small"
+# Japanese sentences one particle or a negation apart can still score
+# well above 0.9, so the bar is set high: fewer semantic hits, but a hit
+# is a near-verbatim repeat. Values above 1 disable the tier.
+SIM_THRESHOLD = float(os.getenv("GPT_CACHE_THRESHOLD", "0.97"))
+# Embeddings kept in memory; the oldest are overwritten past this
+MAX_VECTORS = int(os.getenv("GPT_CACHE_MAX_VECTORS", "50000"))
+
+
+def _sha256(*parts: str) -> str:
+    h = hashlib.sha256()
+    for part in parts:
+        h.update(part.encode("utf-8"))
+        h.update(b"\x00")
+    return h.hexdigest()
+
+
+class GptResponseCache:
+    """
+    Two-tier cache for GPT responses.
+
+    1. Exact tier: SHA-256 of (version, system message, prompt) looked up
+       in a SQLite table.
+    2. Semantic tier: cosine similarity between the embedding of the
+       sentence and previously answered sentences, restricted to entries
+       sharing the same scope (version, system message, focus, template).
+       Only used when the caller passes `embed_text`, i.e. for requests
+       where a near-identical sentence's answer is acceptable.
+
+    Embeddings live in one preallocated matrix, grown by doubling up to
+    `max_vectors` and then reused as a ring, with the rows of each scope
+    listed separately so a lookup only scores its own scope.
+    """
+
+    def __init__(self,
+                 db_path: Path = CACHE_DB_PATH,
+                 index_path: Path = INDEX_PATH,
+                 threshold: float = SIM_THRESHOLD,
+                 embed_model: str = EMBED_MODEL,
+                 max_vectors: int = MAX_VECTORS) -> None:
+        db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.index_path = index_path
+        self.threshold = threshold
+        self.embed_model = embed_model
+        self.max_vectors = max(1, max_vectors)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(db_path), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS gpt_cache (
+                key TEXT PRIMARY KEY,
+                scope TEXT NOT NULL,
+                response TEXT NOT NULL
+            )""")
+        self._conn.commit()
+        self._client = None
+        # Responses preloaded at startup, served without touching SQLite
+        self._precomputed: Dict[str, str] = {}
+        # Slot-aligned: row i of _vectors belongs to _keys[i]/_scopes[i]
+        self._vectors = np.zeros((0, 0), dtype=np.float32)
+        self._keys: List[str] = []
+        self._scopes: List[str] = []
+        # Next slot to overwrite once the ring is full
+        self._next = 0
+        self._by_scope: Dict[str, List[int]] = {}
+        self._load_index()
+
+    # ── Persistence ──────────────────────────────────────────────
+    def _load_index(self) -> None:
+        if not self.index_path.exists():
+            return
+        try:
+            with np.load(self.index_path) as data:
+                # Saved oldest first; keep the newest that fit
+                keep = slice(-self.max_vectors, None)
+                vectors = data["vectors"][keep].astype(np.float32)
+                keys = data["keys"][keep].tolist()
+                scopes = data["scopes"][keep].tolist()
+            if keys:
+                self._add_vectors(vectors, keys, scopes)
+            logger.info(f"Loaded {len(self._keys)} cached GPT embeddings")
+        except Exception as e:
+            logger.error(f"Could not load GPT cache index: {e}")
+
+    def _ordered_slots(self) -> List[int]:
+        """
+        Filled slots, oldest first.
+        """
+        n = len(self._keys)
+        if n < self.max_vectors:
+            return list(range(n))
+        return list(range(self._next, n)) + list(range(self._next))
+
+    def save_index(self) -> None:
+        """
+        Write the in-memory embedding index to disk.
+        """
+        with self._lock:
+            if not self._keys:
+                return
+            order = self._ordered_slots()
+            np.savez(self.index_path,
+                     vectors=self._vectors[order],
+                     keys=np.array([self._keys[i] for i in order]),
+                     scopes=np.array([self._scopes[i] for i in order]))
+        logger.info(f"Saved {len(self._keys)} GPT embeddings")
+
+    def close(self) -> None:
+        self.save_index()
+        self._conn.close()
+
+    # ── Embeddings ───────────────────────────────────────────────
+    def _embed_many(self, texts: List[str]) -> Optional[np.ndarray]:
+        """
+        Embed several texts in one API call, returning unit-norm rows.
+        """
+        if self._client is None:
+            from utils.env_utils import get_settings
+            api_key = get_settings().OPENAI_API_KEY
+            if not api_key:
+                return None
+            from openai import OpenAI
+            from processing.gpt_wrapper import GptModel
+            self._client = OpenAI(api_key=api_key,
+                                  http_client=GptModel._get_http())
+        try:
+            resp = self._client.embeddings.create(model=self.embed_model,
+                                                  input=texts)
+        except Exception as e:
+            logger.warning(f"Embedding failed, skipping semantic tier: {e}")
+            return None
+        vecs = np.asarray([d.embedding for d in resp.data], dtype=np.float32)
+        norms = np.linalg.norm(vecs, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        return vecs / norms
+
+    def _embed(self, text: str) -> Optional[np.ndarray]:
+        vecs = self._embed_many([text])
+        return None if vecs is None else vecs[0]
+
+    def _nearest(self, vec: np.ndarray, scope: str) -> Optional[str]:
+        with self._lock:
+            rows = self._by_scope.get(scope)
+            if not rows:
+                return None
+            sims = self._vectors[rows] @ vec
+            best = int(np.argmax(sims))
+            if sims[best] < self.threshold:
+                return None
+            return self._keys[rows[best]]
+
+    def _take_slot(self, dim: int) -> int:
+        """
+        Slot for a new vector: append while below capacity (doubling the
+        matrix when it fills), else overwrite the oldest entry.
+        """
+        n = len(self._keys)
+        if n < self.max_vectors:
+            if n == self._vectors.shape[0]:
+                grown = np.zeros((min(max(2 * n, 64), self.max_vectors), dim),
+                                 dtype=np.float32)
+                if n:
+                    grown[:n] = self._vectors
+                self._vectors = grown
+            self._keys.append("")
+            self._scopes.append("")
+            return n
+        slot = self._next
+        self._next = (slot + 1) % self.max_vectors
+        old_scope = self._scopes[slot]
+        rows = self._by_scope[old_scope]
+        rows.remove(slot)
+        if not rows:
+            del self._by_scope[old_scope]
+        return slot
+
+    def _add_vectors(self,
+                     vecs: np.ndarray,
+                     keys: List[str],
+                     scopes: List[str]) -> None:
+        with self._lock:
+            for vec, key, scope in zip(vecs, keys, scopes):
+                slot = self._take_slot(vecs.shape[1])
+                self._vectors[slot] = vec
+                self._keys[slot] = key
+                self._scopes[slot] = scope
+                self._by_scope.setdefault(scope, []).append(slot)
+
+    def _add_vector(self, vec: np.ndarray, key: str, scope: str) -> None:
+        self._add_vectors(vec[None, :], [key], [scope])
+
+    # ── Exact tier ───────────────────────────────────────────────
+    def _get(self, key: str) -> Optional[str]:
+        pre = self._precomputed.get(key)
+        if pre is not None:
+            return pre
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT response FROM gpt_cache WHERE key = ?",
+                (key,)).fetchone()
+        return row[0] if row else None
+
+    def _put(self, key: str, scope: str, response: str) -> None:
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO gpt_cache VALUES (?, ?, ?)",
+                (key, scope, response))
+            self._conn.commit()
+
+    def get(self, version: str, sys_msg: str, prompt: str) -> Optional[str]:
+        """
+        Exact-tier lookup only; never calls the API.
+        """
+        return self._get(_sha256(version, sys_msg, prompt))
+
+    def put(self,
+            version: str,
+            sys_msg: str,
+            prompt: str,
+            response: str,
+            scope: str = "") -> None:
+        """
+        Store a response obtained outside `get_or_request` (e.g. from a
+        batched request) so later single requests hit the exact tier.
+        """
+        if response:
+            self._put(_sha256(version, sys_msg, prompt),
+                      _sha256(version, sys_msg, scope),
+                      response)
+
+    def warm(self,
+             entries: List[Tuple[str, str, str, str]]) -> int:
+        """
+        Preload known (version, sys_msg, prompt, response) entries so
+        repeat queries skip SQLite. Exact tier only: these are whole
+        sentence explanations, which never match semantically.
+
+        Returns:
+            int: Number of entries preloaded.
+        """
+        with self._lock:
+            for version, sys_msg, prompt, response in entries:
+                key = _sha256(version, sys_msg, prompt)
+                if key in self._precomputed:
+                    continue
+                self._precomputed[key] = response
+                self._conn.execute(
+                    "INSERT OR IGNORE INTO gpt_cache VALUES (?, ?, ?)",
+                    (key, _sha256(version, sys_msg, ""), response))
+            self._conn.commit()
+        return len(self._precomputed)
+
+    def get_or_request(self,
+                       version: str,
+                       sys_msg: str,
+                       prompt: str,
+                       request_fn: Callable[[], str],
+                       embed_text: Optional[str] = None,
+                       scope: str = "") -> str:
+        """
+        Return a cached response for the prompt, or call `request_fn`
+        and cache its result.
+
+        Args:
+            version (str): GPT model version.
+            sys_msg (str): System message used for the request.
+            prompt (str): Fully formatted prompt.
+            request_fn (Callable): Performs the actual GPT request.
+            embed_text (str): Text to embed for the semantic tier,
+            usually the bare sentence. Semantic lookup is skipped if None.
+            scope (str): Extra discriminator (focus word, template) that
+            semantic matches must share.
+
+        Returns:
+            str: GPT response text.
+        """
+        key = _sha256(version, sys_msg, prompt)
+        hit = self._get(key)
+        if hit is not None:
+            return hit
+
+        scope = _sha256(version, sys_msg, scope)
+        vec = self._embed(embed_text) if embed_text else None
+        if vec is not None:
+            near_key = self._nearest(vec, scope)
+            if near_key is not None:
+                near = self._get(near_key)
+                if near is not None:
+                    logger.info("Semantic GPT cache hit")
+                    return near
+
+        response = request_fn()
+        if response:
+            self._put(key, scope, response)
+            if vec is not None:
+                self._add_vector(vec, key, scope)
+        return response
+
+
+_cache: Optional[GptResponseCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_gpt_cache() -> GptResponseCache:
+    """
+    Process-wide GptResponseCache, created on first use.
+    """
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = GptResponseCache()
+    return _cache
+
+
+def close_gpt_cache() -> None:
+    """
+    Persist the embedding index if the cache was ever used.
+    """
+    global _cache
+    if _cache is not None:
+        _cache.close()
+        _cache = None
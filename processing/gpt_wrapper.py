@@ -1,8 +1,89 @@
-from openai import OpenAI
+from openai import (AsyncOpenAI,
+                    DefaultAsyncHttpxClient,
+                    DefaultHttpxClient,
+                    OpenAI)
 from openai.types.chat.chat_completion import ChatCompletion
-from dotenv import dotenv_values, load_dotenv
+from dotenv import dotenv_values
+from functools import cached_property, lru_cache
+import httpx
 import logging
+import orjson
 import os
+import threading
+from typing import Optional
+
+
+# finish_reason string → code used by finish_reason_code_dict
+_FINISH_REASON_MAP = {'stop': 0,
+                      'length': 1,
+                      'function_call': 2,
+                      'content_filter': 3,
+                      'null': 4}
+
+# Parsed once; GptModel creation used to re-read .env every time
+_ENV_CACHE = dotenv_values('.env') if os.path.exists('.env') else {}
+
+
+def _env_api_key() -> str:
+    key = _ENV_CACHE.get('OPENAI_API_KEY') or os.environ.get(
+        'OPENAI_API_KEY')
+    if not key:
+        GptModel.logger.error("OpenAI key not found")
+        raise KeyError('OPENAI_API_KEY')
+    return key
+
+
+# Returned by _sse_delta for the stream's terminating "[DONE]" line
+SSE_DONE = object()
+
+
+def _sse_delta(line: str):
+    """
+    Content delta carried by one raw SSE line of a chat completion
+    stream: "" for lines without content, SSE_DONE at the end marker.
+    Raises on an error frame, which carries no `choices`.
+    """
+    if not line.startswith("data: "):
+        return ""
+    payload = line[6:]
+    if payload == "[DONE]":
+        return SSE_DONE
+    data = orjson.loads(payload)
+    error = data.get("error")
+    if error:
+        message = error.get("message") if isinstance(error, dict) else error
+        raise Exception(f"Stream error: {message}")
+    choices = data.get("choices")
+    if not choices:
+        return ""
+    return choices[0].get("delta", {}).get("content") or ""
+
+
+# Context window of each supported model, in tokens
+MODEL_CONTEXT_WINDOW = {'gpt-4.1': 1047576,
+                        'gpt-4.1-mini': 1047576,
+                        'gpt-4o': 128000,
+                        'gpt-4o-mini': 128000}
+
+
+@lru_cache(maxsize=None)
+def _encoding(model: str):
+    """
+    tiktoken encoder for a model, or None if it can't be loaded (not
+    installed, or the BPE file can't be downloaded on an offline host);
+    budget checks are then skipped. Models newer than the installed
+    tiktoken fall back to o200k_base.
+    """
+    try:
+        import tiktoken
+        try:
+            return tiktoken.encoding_for_model(model)
+        except KeyError:
+            return tiktoken.get_encoding("o200k_base")
+    except Exception as e:
+        GptModel.logger.warning(f"No tokenizer for {model}, "
+                                f"skipping context budget checks: {e}")
+        return None
 
 
 class GptModel:
@@ -12,6 +93,9 @@ class GptModel:
                     'gpt-4.1': {'input': 2.0, 'output': 8},
                     'gpt-4o': {'input': 2.5, 'output': 10},
                     'gpt-4.1-mini': {'input': 0.4, 'output': 1.6}}
+    # (input, output) dollars per single token
+    per_token = {m: (v['input'] / 1e6, v['output'] / 1e6)
+                 for m, v in pricing_dict.items()}
 
     logger = logging.getLogger('gpt-model')
     fr_0 = 'Success,Complete Message'
@@ -26,20 +110,40 @@ class GptModel:
                                3: fr_3,
                                4: fr_4}
 
+    # One connection pool shared by every client, so TLS sessions and
+    # HTTP/2 connections are reused across GptModel instances
+    _http_client = None
+    _async_http_client = None
+    _http_lock = threading.Lock()
+
+    @classmethod
+    def _get_http(cls) -> httpx.Client:
+        if cls._http_client is None:
+            with cls._http_lock:
+                if cls._http_client is None:
+                    cls._http_client = DefaultHttpxClient(
+                        http2=True,
+                        limits=httpx.Limits(max_connections=100,
+                                            max_keepalive_connections=20))
+        return cls._http_client
+
+    @classmethod
+    def _get_async_http(cls) -> httpx.AsyncClient:
+        if cls._async_http_client is None:
+            with cls._http_lock:
+                if cls._async_http_client is None:
+                    cls._async_http_client = DefaultAsyncHttpxClient(
+                        http2=True,
+                        limits=httpx.Limits(max_connections=100,
+                                            max_keepalive_connections=20))
+        return cls._async_http_client
+
     def __init__(self, version: str, system_msg: str = 'default',
                  from_dotenv: bool = True, ApiKey=None,
                  max_context: int = 100000):
         try:
             if from_dotenv:
-                load_dotenv()
-                try:
-                    key = dotenv_values('.env')['OPENAI_API_KEY']
-                except Exception:
-                    try:
-                        key = os.environ["OPENAI_API_KEY"]
-                    except Exception as e:
-                        GptModel.logger.error("OpenAI key not found")
-                        raise e
+                key = _env_api_key()
                 self.ApiKey = key
                 ApiKey = self.ApiKey
             elif ApiKey is not None:
@@ -49,7 +153,6 @@ class GptModel:
                 _msg += 'client'
                 GptModel.logger.error(_msg)
                 raise Exception(_msg)
-            self.client = OpenAI(api_key=key)
             if version not in GptModel.model_versions:
                 _msg = 'Model version provided is not supported, got'
                 _msg += f"{version};Expected one of {GptModel.model_versions}"
@@ -80,11 +183,63 @@ class GptModel:
             self.requests_info = []
             self.sessions_info = []
             self.text_finishin_reasons = []
+            # Prompt tokens in `messages`, counted on the first request
+            self._running_tokens = None
         except Exception as e:
             _msg = f'Error while cretaing Model Object : {str(e)}'
             GptModel.logger.error(_msg)
             raise Exception(_msg)
 
+    @cached_property
+    def client(self) -> OpenAI:
+        """
+        OpenAI client, built on the first request so objects that are only
+        serialized or inspected never pay for it.
+        """
+        return OpenAI(api_key=self.ApiKey, http_client=GptModel._get_http())
+
+    @cached_property
+    def aclient(self) -> AsyncOpenAI:
+        """
+        Async counterpart of `client`, used for streaming from the event
+        loop.
+        """
+        return AsyncOpenAI(api_key=self.ApiKey,
+                           http_client=GptModel._get_async_http())
+
+    def count_tokens(self, message: dict) -> int:
+        """
+        Prompt tokens a chat message adds, including the ~4 tokens of
+        per-message framing. 0 when tiktoken is unavailable.
+        """
+        enc = _encoding(self.model)
+        if enc is None:
+            return 0
+        return len(enc.encode(message["content"] or "")) + 4
+
+    def _check_budget(self, message: dict, reserved_output: int) -> int:
+        """
+        Refuse locally, before any network call, if the prompt plus the
+        reserved output would exceed `max_context` or the model's context
+        window. Skipped when no tokenizer is available.
+        """
+        if _encoding(self.model) is None:
+            return 0
+        if self._running_tokens is None:
+            self._running_tokens = sum(self.count_tokens(m)
+                                       for m in self.messages)
+        n = self.count_tokens(message)
+        # max_context stays a cap; the model's window only lowers it
+        w = self.window_token_limit
+        limit = min(MODEL_CONTEXT_WINDOW.get(self.model, w), w)
+        if self._running_tokens + n + reserved_output > limit:
+            raise Exception('Max Context Exceeded')
+        return n
+
+    def _add_tokens(self, n: int) -> None:
+        if self._running_tokens is not None:
+            self._running_tokens += n
+
     @staticmethod
     def format_input(message: str):
         return {"role": "user", "content": message}
@@ -95,15 +250,12 @@ class GptModel:
 
     @staticmethod
     def response_price(model: str, input_tokens: int, output_tokens: int):
-        if model not in GptModel.model_versions:
+        rates = GptModel.per_token.get(model)
+        if rates is None:
             raise Exception(f'Model {model} not supported')
-        input_price_1m = GptModel.pricing_dict[model]['input']
-        output_price_1m = GptModel.pricing_dict[model]['output']
-        input_price_per_token = input_price_1m/(10**6)
-        output_price_per_token = output_price_1m/(10**6)
-        InputPrice = input_tokens*input_price_per_token
-        OutputPrice = output_tokens*output_price_per_token
-        return InputPrice+OutputPrice
+        input_price_per_token, output_price_per_token = rates
+        return (input_tokens*input_price_per_token
+                + output_tokens*output_price_per_token)
 
     @staticmethod
     def process_output(response: ChatCompletion,
@@ -121,19 +273,10 @@ class GptModel:
             em += f"and calculating price : {str(e)}"
             raise Exception(em)
         message = response.choices[0].message.content
-        finish_reason = response.choices[0].finish_reason
-        if finish_reason == 'stop':
-            finish_reason = 0
-        elif finish_reason == 'length':
-            finish_reason = 1
-        elif finish_reason == 'function_call':
-            finish_reason = 2
-        elif finish_reason == 'content_filter':
-            finish_reason = 3
-        elif finish_reason == 'null':
-            finish_reason = 4
-        else:
-            em = f'Received Unexpected Finish Reason: {finish_reason}'
+        reason = response.choices[0].finish_reason
+        finish_reason = _FINISH_REASON_MAP.get(reason)
+        if finish_reason is None:
+            em = f'Received Unexpected Finish Reason: {reason}'
             raise Exception(em)
 
         return {'output': message, 'prompt_tokens': prompt_tokens,
@@ -159,10 +302,32 @@ class GptModel:
         r = f"{c}({ats[0]},{ats[1]},{ats[2]},{ats[3]},{ats[4]})"
         return r
 
-    def request(self, prompt: str):
-        self.inputs.append(prompt)
+    def complete(self, prompt: str, sys_msg: Optional[str] = None) -> str:
+        """
+        One-shot request with only the system message as context. Does
+        not read or extend the conversation history, so a single
+        instance can be shared between callers and threads. `sys_msg`
+        overrides the instance's system message for this call.
+        """
+        system = self.sys_msg
+        if sys_msg is not None:
+            system = {"role": "system", "content": sys_msg}
+        msgs = [system, GptModel.format_input(prompt)]
+        try:
+            result = self.client.chat.completions.create(model=self.model,
+                                                         messages=msgs)
+            return GptModel.process_output(result, self.model)['output']
+        except Exception as e:
+            _msg = f'Error Requesting : {str(e)}'
+            GptModel.logger.error(_msg)
+            raise Exception(_msg)
+
+    def request(self, prompt: str, reserved_output: int = 1024):
         new_message = GptModel.format_input(prompt)
+        n_prompt = self._check_budget(new_message, reserved_output)
+        self.inputs.append(prompt)
         self.messages.append(new_message)
+        self._add_tokens(n_prompt)
         wtl = self.window_token_limit
         if self.request_count > 0 and self.total_tokens >= wtl:
             raise Exception('Max Context Exceeded')
@@ -173,7 +338,10 @@ class GptModel:
             f_result = GptModel.process_output(result, self.model)
             self.requests_info.append(f_result)
             self.outputs.append(f_result['output'])
-            self.messages.append(GptModel.format_output(f_result['output']))
+            out_message = GptModel.format_output(f_result['output'])
+            self.messages.append(out_message)
+            if self._running_tokens is not None:
+                self._add_tokens(self.count_tokens(out_message))
             self.input_tokens = f_result['prompt_tokens']
             self.output_tokens = f_result['output_tokens']
             self.total_tokens = f_result['total_tokens']
@@ -189,34 +357,80 @@ class GptModel:
             GptModel.logger.error(_msg)
             raise Exception(_msg)
 
-    def stream_request(self, prompt: str):
+    def stream_request(self, prompt: str, reserved_output: int = 1024):
         """Send a streaming chat request; yield each content
         chunk as it arrives."""
         # 1) stash the user prompt in history
+        new_message = GptModel.format_input(prompt)
+        n_prompt = self._check_budget(new_message, reserved_output)
         self.inputs.append(prompt)
-        self.messages.append(GptModel.format_input(prompt))
+        self.messages.append(new_message)
+        self._add_tokens(n_prompt)
 
         try:
-            # 2) fire off a streaming completion
-            stream = self.client.chat.completions.create(
+            # 2) fire off a streaming completion, reading the raw SSE
+            # lines instead of validating a ChatCompletionChunk per delta
+            parts = []
+            completions = self.client.chat.completions
+            with completions.with_streaming_response.create(
                 model=self.model,
                 messages=self.messages,
                 stream=True
-            )
-
-            full_output = ""
-            # 3) as chunks come in, yield them immediately
-            for chunk in stream:
-                delta = chunk.choices[0].delta
-                # use getattr to safely pull out .content
-                text = getattr(delta, "content", None) or ""
-                if text:
-                    full_output += text
-                    yield text
+            ) as response:
+                # 3) as chunks come in, yield them immediately
+                for line in response.iter_lines():
+                    text = _sse_delta(line)
+                    if text is SSE_DONE:
+                        break
+                    if text:
+                        parts.append(text)
+                        yield text
+            full_output = "".join(parts)
 
             # 4) once done, record the full response
             self.outputs.append(full_output)
-            self.messages.append(GptModel.format_output(full_output))
+            out_message = GptModel.format_output(full_output)
+            self.messages.append(out_message)
+            if self._running_tokens is not None:
+                self._add_tokens(self.count_tokens(out_message))
+            self.request_count += 1
+
+        except Exception as e:
+            GptModel.logger.error(f"Streaming request error: {e}")
+            raise Exception(f"Error during streaming request: {e}")
+
+    async def astream_request(self, prompt: str,
+                              reserved_output: int = 1024):
+        """Async version of `stream_request`, iterated on the event loop
+        without a threadpool hop per chunk."""
+        new_message = GptModel.format_input(prompt)
+        n_prompt = self._check_budget(new_message, reserved_output)
+        self.inputs.append(prompt)
+        self.messages.append(new_message)
+        self._add_tokens(n_prompt)
+
+        try:
+            parts = []
+            completions = self.aclient.chat.completions
+            async with completions.with_streaming_response.create(
+                model=self.model,
+                messages=self.messages,
+                stream=True
+            ) as response:
+                async for line in response.iter_lines():
+                    text = _sse_delta(line)
+                    if text is SSE_DONE:
+                        break
+                    if text:
+                        parts.append(text)
+                        yield text
+            full_output = "".join(parts)
+
+            self.outputs.append(full_output)
+            out_message = GptModel.format_output(full_output)
+            self.messages.append(out_message)
+            if self._running_tokens is not None:
+                self._add_tokens(self.count_tokens(out_message))
             self.request_count += 1
 
         except Exception as e:
@@ -234,6 +448,7 @@ class GptModel:
                         'request_count': self.request_count}
         self.sessions_info.append(session_info)
         self.messages = [self.sys_msg]
+        self._running_tokens = None
         self.outputs = []
         self.inputs = []
         self.total_price = 0
@@ -268,7 +483,7 @@ class GptModel:
         fmt_sys_msg = {"role": "system", "content": info['sys_msg']}
         gpt_model.raw_sys_msg = info['sys_msg']
         gpt_model.from_dotenv = True
-        gpt_model.ApiKey = dotenv_values('.env')['OPENAI_API_KEY']
+        gpt_model.ApiKey = _env_api_key()
         gpt_model.sys_msg = fmt_sys_msg
         gpt_model.window_token_limit = info['max_context']
         gpt_model.messages = info['messages']
@@ -282,7 +497,7 @@ class GptModel:
         gpt_model.requests_info = info['requests_info']
         gpt_model.sessions_info = info['sessions_info']
         gpt_model.text_finishin_reasons = info['text_finishin_reasons']
-        gpt_model.client = OpenAI(api_key=gpt_model.ApiKey)
+        gpt_model._running_tokens = None
         return gpt_model
 
     def serialize(self):
@@ -1,23 +1,194 @@
 import fugashi
-from typing import List, Dict, Optional
+import hashlib
+import orjson
+import os
+import sqlite3
+import threading
+from collections import OrderedDict
+from functools import cached_property, lru_cache
+from importlib import metadata
+from pathlib import Path
+from typing import List, Dict, Optional, Tuple
 from jamdict import Jamdict
 from processing.gpt_wrapper import GptModel
-from functools import lru_cache
+from processing.gpt_cache import DATA_DIR, get_gpt_cache
 from models.FocusInfo import FocusInfo
 import logging
 
 logger = logging.getLogger(__name__)
 
+# Appended to the system message of batched requests
+BATCH_INSTRUCTIONS = """
+        You will receive several numbered items, each a sentence and an
+        optional focus word. Answer every item independently, following
+        the rules above.
+        Respond ONLY with a JSON list, no code fences:
+        [{"i": 1, "explanation": "..."}, {"i": 2, "explanation": "..."}]
+        """
+
+# Shared placeholder for breakdowns without a focus word. Built once and
+# without validation since every field is a known-good literal.
+EMPTY_FOCUS = FocusInfo.model_construct(word="",
+                                        reading="",
+                                        meanings=[],
+                                        jlpt="",
+                                        examples=[])
+
+
+# Kept under data/ beside the GPT cache, not in the web-served media tree
+TOKENIZE_CACHE_PATH = DATA_DIR / "tokenize_cache.sqlite"
+TOKEN_FIELDS = ("surface", "lemma", "reading", "pos")
+# Joins sentences for a single tagger pass (U+2063 INVISIBLE SEPARATOR)
+SENTENCE_SENTINEL = "\u2063"
+
+
+def _fugashi_version() -> str:
+    # fugashi doesn't define __version__; read it from the package metadata
+    try:
+        return metadata.version("fugashi")
+    except metadata.PackageNotFoundError:
+        return "unknown"
+
 
 class TokenizerService:
     """Service that performs morphological analysis using Fugashi + UniDic."""
 
-    def __init__(self):
+    def __init__(self, cache_path: Optional[Path] = TOKENIZE_CACHE_PATH):
         self.tagger = fugashi.Tagger()
+        # Cached results are only valid for this tagger + dictionary
+        dict_info = getattr(self.tagger, "dictionary_info", None) or []
+        salt = f"{_fugashi_version()}|" + "|".join(
+            f"{d.get('filename')}:{d.get('version')}" for d in dict_info)
+        self._salt = salt.encode("utf-8") + b"\x00"
+        self._disk: Optional[sqlite3.Connection] = None
+        self._disk_lock = threading.Lock()
+        if cache_path is not None:
+            try:
+                cache_path.parent.mkdir(parents=True, exist_ok=True)
+                self._disk = sqlite3.connect(str(cache_path),
+                                             check_same_thread=False)
+                self._disk.execute("PRAGMA journal_mode=WAL")
+                self._disk.execute("""
+                    CREATE TABLE IF NOT EXISTS tokenize_cache (
+                        key BLOB PRIMARY KEY,
+                        tokens BLOB NOT NULL
+                    )""")
+                self._disk.commit()
+            except sqlite3.Error as e:
+                logger.warning(f"Tokenize disk cache disabled: {e}")
+                self._disk = None
+        # In-memory first level in front of the SQLite cache
+        self._cached = lru_cache(maxsize=65536)(self._tokenize_tuples)
+
+    def _tag(self, sentence: str) -> Tuple[Tuple[str, ...], ...]:
+        out = []
+        append = out.append
+        for word in self.tagger(sentence):
+            # Each .feature access rebuilds the UniDic feature tuple
+            feature = word.feature
+            append((word.surface, feature.lemma, feature.kana, feature.pos1))
+        return tuple(out)
+
+    def _disk_key(self, sentence: str) -> bytes:
+        return hashlib.blake2b(self._salt + sentence.encode("utf-8"),
+                               digest_size=16).digest()
+
+    def _disk_get(self, sentence: str
+                  ) -> Optional[Tuple[Tuple[str, ...], ...]]:
+        if self._disk is None:
+            return None
+        with self._disk_lock:
+            row = self._disk.execute(
+                "SELECT tokens FROM tokenize_cache WHERE key = ?",
+                (self._disk_key(sentence),)).fetchone()
+        if row is None:
+            return None
+        return tuple(tuple(t) for t in orjson.loads(row[0]))
+
+    def _disk_put(self,
+                  results: Dict[str, Tuple[Tuple[str, ...], ...]]) -> None:
+        if self._disk is None or not results:
+            return
+        with self._disk_lock:
+            self._disk.executemany(
+                "INSERT OR REPLACE INTO tokenize_cache VALUES (?, ?)",
+                [(self._disk_key(sentence), orjson.dumps(tokens))
+                 for sentence, tokens in results.items()])
+            self._disk.commit()
+
+    def _tokenize_tuples(self, sentence: str) -> Tuple[Tuple[str, ...], ...]:
+        tokens = self._disk_get(sentence)
+        if tokens is None:
+            tokens = self._tag(sentence)
+            self._disk_put({sentence: tokens})
+        return tokens
+
+    def _tag_many(self, sentences: List[str]
+                  ) -> Optional[List[Tuple[Tuple[str, ...], ...]]]:
+        """
+        Tag several sentences in one tagger call, splitting the tokens
+        back by character offset. Returns None if a token crossed a
+        sentence boundary.
+        """
+        text = SENTENCE_SENTINEL.join(sentences)
+        # Start offset of each sentence in the joined text
+        starts, pos = [], 0
+        for sentence in sentences:
+            starts.append(pos)
+            pos += len(sentence) + len(SENTENCE_SENTINEL)
+        out: List[List[Tuple[str, ...]]] = [[] for _ in sentences]
+        idx, offset = 0, 0
+        for word in self.tagger(text):
+            surface = word.surface
+            offset += len(getattr(word, "white_space", "") or "")
+            begin, offset = offset, offset + len(surface)
+            if not surface.strip(SENTENCE_SENTINEL):
+                continue
+            while idx + 1 < len(starts) and begin >= starts[idx + 1]:
+                idx += 1
+            end = starts[idx] + len(sentences[idx])
+            if begin < starts[idx] or offset > end:
+                return None
+            feature = word.feature
+            out[idx].append((surface, feature.lemma,
+                             feature.kana, feature.pos1))
+        return [tuple(tokens) for tokens in out]
+
+    def tokenize_many(self, sentences: List[str]
+                      ) -> List[List[Dict[str, str]]]:
+        """
+        Tokenize several sentences with a single tagger call for every
+        sentence missing from the disk cache.
+
+        Args:
+            sentences (List[str]): Sentences to tokenize.
+
+        Returns:
+            List[List[Dict[str, str]]]: Token metadata per sentence.
+        """
+        results: Dict[str, Tuple[Tuple[str, ...], ...]] = {}
+        pending: List[str] = []
+        for sentence in dict.fromkeys(sentences):
+            cached = self._disk_get(sentence)
+            if cached is None:
+                pending.append(sentence)
+            else:
+                results[sentence] = cached
+        if pending:
+            tagged = self._tag_many(pending)
+            if tagged is None:
+                tagged = [self._tag(sentence) for sentence in pending]
+            fresh = dict(zip(pending, tagged))
+            self._disk_put(fresh)
+            results.update(fresh)
+        return [[dict(zip(TOKEN_FIELDS, t)) for t in results[sentence]]
+                for sentence in sentences]
 
     def tokenize(self, sentence: str) -> List[Dict[str, str]]:
         """
-        Tokenize a Japanese sentence using Fugashi.
+        Tokenize a Japanese sentence using Fugashi. Results are memoized
+        in memory and on disk, keyed by the sentence and the tagger's
+        dictionary version.
 
         Args:
             sentence (str): The sentence to tokenize.
@@ -25,43 +196,286 @@ class TokenizerService:
         Returns:
             List[Dict[str, str]]: List of token metadata.
         """
-        return [
-            {
-                "surface": word.surface,
-                "lemma": word.feature.lemma,
-                "reading": word.feature.kana,
-                "pos": word.feature.pos1,
-            }
-            for word in self.tagger(sentence)
-        ]
+        return [dict(zip(TOKEN_FIELDS, t)) for t in self._cached(sentence)]
+
+
+# JSON rather than pickle: loading it at startup must not be able to
+# run code, and it lives under data/, outside the web-served media tree
+LEMMA_CACHE_PATH = DATA_DIR / "jamdict_cache.json"
+LEMMA_CACHE_SIZE = int(os.getenv("LEMMA_CACHE_SIZE", "32768"))
+
+
+class LemmaCache:
+    """
+    Bounded lemma -> dictionary info map with LRU eviction, shared by
+    every WordInfoService and persisted across restarts.
+    """
+
+    def __init__(self, maxsize: int = LEMMA_CACHE_SIZE,
+                 path: Path = LEMMA_CACHE_PATH):
+        self.maxsize = maxsize
+        self.path = path
+        self._data: "OrderedDict[str, Dict]" = OrderedDict()
+        self._load()
+
+    def _load(self) -> None:
+        try:
+            with open(self.path, "rb") as f:
+                data = orjson.loads(f.read())
+            if not isinstance(data, dict):
+                raise ValueError("expected a JSON object")
+            self._data.update(data)
+            logger.info(f"Loaded {len(self._data)} cached lemmas")
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            logger.warning(f"Could not load lemma cache: {e}")
+
+    def save(self) -> None:
+        if not self._data:
+            return
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_suffix(".tmp")
+        with open(tmp, "wb") as f:
+            # Insertion order is kept, so LRU order survives a restart
+            f.write(orjson.dumps(dict(self._data)))
+        os.replace(tmp, self.path)
+        logger.info(f"Saved {len(self._data)} cached lemmas")
+
+    def get(self, lemma: str) -> Optional[Dict]:
+        info = self._data.get(lemma)
+        if info is not None:
+            try:
+                self._data.move_to_end(lemma)
+            except KeyError:
+                # Evicted by another thread in between; still a hit
+                pass
+        return info
+
+    def put(self, lemma: str, info: Dict) -> None:
+        self._data[lemma] = info
+        while len(self._data) > self.maxsize:
+            try:
+                self._data.popitem(last=False)
+            except KeyError:
+                break
+
+    def cache_clear(self) -> None:
+        self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+_lemma_cache: Optional[LemmaCache] = None
+
+
+def get_lemma_cache() -> LemmaCache:
+    global _lemma_cache
+    if _lemma_cache is None:
+        _lemma_cache = LemmaCache()
+    return _lemma_cache
+
+
+def save_lemma_cache() -> None:
+    """
+    Persist the lemma cache if it was ever used.
+    """
+    if _lemma_cache is not None:
+        _lemma_cache.save()
+
+
+# The dictionary is read-only: map it into memory and give each
+# connection a large page cache instead of a syscall per page read
+JMDICT_PRAGMAS = (
+    "PRAGMA query_only=1",
+    "PRAGMA mmap_size=1073741824",
+    "PRAGMA cache_size=-262144",
+    "PRAGMA temp_store=MEMORY",
+)
+
+
+def _tune_jmdict(conn: sqlite3.Connection) -> None:
+    for pragma in JMDICT_PRAGMAS:
+        conn.execute(pragma)
+
+
+def _empty_info(lemma: str) -> Dict:
+    return {
+        "word": lemma,
+        "reading": "",
+        "meanings": [],
+        "jlpt": "Unknown",
+        "examples": []
+    }
 
 
 class WordInfoService:
     """Looks up dictionary and JLPT info using Jamdict."""
 
+    # Lemmas bound per IN (...) query, below SQLite's variable limit
+    BULK_CHUNK = 500
+
     def __init__(self):
         self.jam = Jamdict()
+        self._conn: Optional[sqlite3.Connection] = None
+        # Jamdict's connections can't cross threads; keep one per thread
+        self._local = threading.local()
+        self._conn_lock = threading.Lock()
+        self.cache = get_lemma_cache()
 
-    @lru_cache(maxsize=1024)
-    def lookup(self, lemma: str) -> Dict[str, str]:
-        result = self.jam.lookup(lemma)
-        if not result.entries:
-            return {
+    def _jmdict_conn(self) -> Optional[sqlite3.Connection]:
+        """
+        Read-only connection to Jamdict's JMdict SQLite file, opened once.
+        """
+        if self._conn is None:
+            db_file = getattr(self.jam, "db_file", None)
+            if not db_file:
+                return None
+            self._conn = sqlite3.connect(f"file:{db_file}?mode=ro",
+                                         uri=True,
+                                         check_same_thread=False)
+            _tune_jmdict(self._conn)
+        return self._conn
+
+    def _jam_ctx(self):
+        """
+        This thread's tuned Jamdict execution context, or None to let
+        Jamdict open its own.
+        """
+        ctx = getattr(self._local, "ctx", None)
+        if ctx is None and not getattr(self._local, "failed", False):
+            try:
+                ctx = self.jam.jmdict.ctx()
+                _tune_jmdict(ctx.conn)
+                self._local.ctx = ctx
+            except Exception as e:
+                logger.warning(f"Could not open a JMdict context: {e}")
+                self._local.failed = True
+                ctx = None
+        return ctx
+
+    def _bulk_query(self, conn: sqlite3.Connection,
+                    lemmas: List[str]) -> Dict[str, Dict]:
+        """
+        Resolve a chunk of lemmas with a fixed number of IN-list queries,
+        mirroring what `lookup` reads from the first matching entry.
+        """
+        marks = ",".join("?" * len(lemmas))
+        rows = conn.execute(
+            "SELECT text, MIN(idseq) FROM ("
+            f"SELECT text, idseq FROM Kanji WHERE text IN ({marks}) "
+            "UNION ALL "
+            f"SELECT text, idseq FROM Kana WHERE text IN ({marks})"
+            ") GROUP BY text", (*lemmas, *lemmas)).fetchall()
+        entry_of = dict(rows)
+        if not entry_of:
+            return {}
+        idseqs = list(set(entry_of.values()))
+        id_marks = ",".join("?" * len(idseqs))
+
+        kana: Dict[int, str] = {}
+        for idseq, text in conn.execute(
+                f"SELECT idseq, text FROM Kana WHERE idseq IN ({id_marks}) "
+                "ORDER BY ID", idseqs):
+            kana.setdefault(idseq, text)
+
+        first_sense = dict(conn.execute(
+            f"SELECT idseq, MIN(ID) FROM Sense WHERE idseq IN ({id_marks}) "
+            "GROUP BY idseq", idseqs).fetchall())
+        glosses: Dict[int, List[str]] = {}
+        if first_sense:
+            sids = list(first_sense.values())
+            s_marks = ",".join("?" * len(sids))
+            for sid, text in conn.execute(
+                    f"SELECT sid, text FROM SenseGloss WHERE sid IN "
+                    f"({s_marks}) ORDER BY rowid", sids):
+                glosses.setdefault(sid, []).append(text)
+
+        out = {}
+        for lemma, idseq in entry_of.items():
+            sid = first_sense.get(idseq)
+            out[lemma] = {
                 "word": lemma,
-                "reading": "",
-                "meanings": [],
+                "reading": kana.get(idseq, ""),
+                "meanings": glosses.get(sid, []) if sid is not None else [],
                 "jlpt": "Unknown",
                 "examples": []
             }
+        return out
+
+    def lookup_many(self, lemmas: List[str]) -> Dict[str, Dict]:
+        """
+        Look up several lemmas with a handful of SQL queries instead of
+        one Jamdict search per lemma.
+
+        Args:
+            lemmas (List[str]): Lemmas to resolve; duplicates are fine.
+
+        Returns:
+            Dict[str, Dict]: lemma -> the same shape `lookup` returns.
+        """
+        found: Dict[str, Dict] = {}
+        missing: List[str] = []
+        for lemma in dict.fromkeys(lemma for lemma in lemmas if lemma):
+            info = self.cache.get(lemma)
+            if info is None:
+                missing.append(lemma)
+            else:
+                found[lemma] = info
+        if not missing:
+            return found
+
+        conn = self._jmdict_conn()
+        if conn is None:
+            found.update((lemma, self.lookup(lemma)) for lemma in missing)
+            return found
+        resolved: Dict[str, Dict] = {}
+        try:
+            with self._conn_lock:
+                for i in range(0, len(missing), self.BULK_CHUNK):
+                    resolved.update(self._bulk_query(
+                        conn, missing[i:i + self.BULK_CHUNK]))
+        except sqlite3.Error as e:
+            # Unexpected schema: resolve through Jamdict instead
+            logger.warning(f"Bulk JMdict lookup failed: {e}")
+            found.update((lemma, self.lookup(lemma)) for lemma in missing)
+            return found
+        put = self.cache.put
+        for lemma in missing:
+            info = resolved.get(lemma) or _empty_info(lemma)
+            put(lemma, info)
+            found[lemma] = info
+        return found
+
+    def lookup(self, lemma: str) -> Dict[str, str]:
+        info = self.cache.get(lemma)
+        if info is None:
+            info = self._lookup_jamdict(lemma)
+            self.cache.put(lemma, info)
+        return info
+
+    def _lookup_jamdict(self, lemma: str) -> Dict[str, str]:
+        # Only entries are read: skip the per-character KanjiDic2 and
+        # the JMnedict name searches Jamdict runs by default
+        result = self.jam.lookup(lemma,
+                                 lookup_chars=False,
+                                 lookup_ne=False,
+                                 ctx=self._jam_ctx())
+        if not result.entries:
+            return _empty_info(lemma)
 
         entry = result.entries[0]
-        kanji = entry.kana_forms[0].text if entry.kana_forms else ""
-        if entry.senses:
-            meanings = [str(g) for g in entry.senses[0].gloss]
-        else:
-            meanings = []
-        tags = getattr(entry, "tags", []) or []
-        jlpt = next((tag for tag in tags if "jlpt" in tag), "Unknown")
+        kana_forms = entry.kana_forms
+        senses = entry.senses
+        kanji = kana_forms[0].text if kana_forms else ""
+        # SenseGloss.__str__ just returns .text; read it directly
+        meanings = [g.text for g in senses[0].gloss] if senses else []
+        jlpt = "Unknown"
+        for tag in getattr(entry, "tags", None) or ():
+            if "jlpt" in tag:
+                jlpt = tag
+                break
 
         return {
             "word": lemma,
@@ -100,6 +514,30 @@ class GptExplainService:
         self.sys_msg = system_msg
         self.version = version
 
+    def _request(self,
+                 sys_msg: str,
+                 prompt: str,
+                 sentence: str,
+                 scope: str = "",
+                 semantic: bool = False) -> str:
+        """
+        Send a prompt through the response cache, only hitting the API
+        on a miss. `semantic` also allows reusing the answer for a
+        near-identical sentence in the same scope.
+        """
+        def call() -> str:
+            # complete() is stateless, so one model serves every
+            # system message, including client-supplied custom ones
+            return self.model.complete(prompt, sys_msg)
+
+        return get_gpt_cache().get_or_request(
+            self.version,
+            sys_msg,
+            prompt,
+            call,
+            embed_text=sentence if semantic else None,
+            scope=scope)
+
     def explain(self,
                 sentence: str,
                 focus: str) -> str:
@@ -115,10 +553,11 @@ class GptExplainService:
             str: GPT-generated explanation with structure, particles,
             and nuance.
         """
-        prompt = f"{sentence}. Explain usage of word : {focus}"
-        model = GptModel(self.version, self.sys_msg)
-        result = model.request(prompt)
-        return result['response']
+        prompt = self._focus_prompt(sentence, focus)
+        # A word's usage reads the same in a near-identical sentence;
+        # whole-sentence and custom prompts only use the exact tier
+        return self._request(self.sys_msg, prompt, sentence, scope=focus,
+                             semantic=True)
 
     def explain_custom(self,
                        sentence: str,
@@ -136,14 +575,14 @@ class GptExplainService:
         Returns:
             str: GPT-generated response
         """
+        template = prompt
         try:
             prompt = prompt.format(sentence, focus)
         except Exception as e:
             logger.error(f"Couldn't format prompt : {e}")
             return None
-        model = GptModel(self.version, sysMsg)
-        result = model.request(prompt)
-        return result['response']
+        return self._request(sysMsg, prompt, sentence,
+                             scope=f"{template}\x00{focus}")
 
     def explain_sentence(self, sentence: str) -> str:
         """
@@ -157,11 +596,115 @@ class GptExplainService:
             str: A full breakdown explanation from GPT, including structure
                  and nuance.
         """
-        prompt = f"Sentence : {sentence}. Word: None, explain the sentence."
+        prompt = self._sentence_prompt(sentence)
+        return self._request(self.sys_msg, prompt, sentence)
+
+    @staticmethod
+    def _sentence_prompt(sentence: str) -> str:
+        return f"Sentence : {sentence}. Word: None, explain the sentence."
 
-        model = GptModel(self.version, self.sys_msg)
-        result = model.request(prompt)
-        return result['response']
+    @staticmethod
+    def _focus_prompt(sentence: str, focus: str) -> str:
+        return f"{sentence}. Explain usage of word : {focus}"
+
+    def _prompt_for(self, sentence: str, focus: Optional[str]) -> str:
+        if focus:
+            return self._focus_prompt(sentence, focus)
+        return self._sentence_prompt(sentence)
+
+    def _request_batch(self,
+                       items: List[Tuple[str, Optional[str]]]
+                       ) -> Dict[int, str]:
+        """
+        One API call for several items. Returns explanations keyed by
+        the item's position in `items`; unparseable answers are omitted.
+        """
+        lines = [f"{n}) sentence={sentence} focus={focus or 'None'}"
+                 for n, (sentence, focus) in enumerate(items, start=1)]
+        raw = self.model.complete("\n".join(lines),
+                                  self.sys_msg + BATCH_INSTRUCTIONS).strip()
+        if raw.startswith("```"):
+            raw = raw.strip("`").removeprefix("json").strip()
+        try:
+            answers = orjson.loads(raw)
+        except orjson.JSONDecodeError as e:
+            logger.warning(f"Batched GPT response was not JSON: {e}")
+            return {}
+        out = {}
+        for answer in answers if isinstance(answers, list) else []:
+            try:
+                i = int(answer["i"]) - 1
+                text = str(answer["explanation"])
+            except (KeyError, TypeError, ValueError):
+                continue
+            if 0 <= i < len(items) and text:
+                out[i] = text
+        return out
+
+    def explain_batch(self,
+                      items: List[Tuple[str, Optional[str]]],
+                      batch_size: int = 10) -> List[Optional[str]]:
+        """
+        Explain several (sentence, focus) pairs with one API call per
+        `batch_size` uncached items instead of one call per item.
+
+        Args:
+            items (List[Tuple[str, Optional[str]]]): (sentence, focus)
+            pairs; a falsy focus explains the whole sentence.
+            batch_size (int): Items packed into a single request.
+
+        Returns:
+            List[Optional[str]]: Explanations in input order.
+        """
+        cache = get_gpt_cache()
+        results: List[Optional[str]] = [None] * len(items)
+        pending: List[int] = []
+        for n, (sentence, focus) in enumerate(items):
+            hit = cache.get(self.version, self.sys_msg,
+                            self._prompt_for(sentence, focus))
+            if hit is not None:
+                results[n] = hit
+            else:
+                pending.append(n)
+
+        for start in range(0, len(pending), batch_size):
+            chunk = pending[start:start + batch_size]
+            try:
+                answers = self._request_batch([items[n] for n in chunk])
+            except Exception as e:
+                logger.error(f"Batched GPT request failed: {e}")
+                answers = {}
+            for pos, n in enumerate(chunk):
+                sentence, focus = items[n]
+                text = answers.get(pos)
+                if text is None:
+                    # Fall back to a single request for this item
+                    text = (self.explain(sentence, focus) if focus
+                            else self.explain_sentence(sentence))
+                else:
+                    cache.put(self.version, self.sys_msg,
+                              self._prompt_for(sentence, focus),
+                              text, scope=focus or "")
+                results[n] = text
+        return results
+
+    def warm_cache(self, rows: List[Tuple[str, str]]) -> int:
+        """
+        Preload the response cache with already generated sentence
+        explanations.
+
+        Args:
+            rows (List[Tuple[str, str]]): (sentence, explanation) pairs.
+
+        Returns:
+            int: Number of cached entries preloaded.
+        """
+        entries = [(self.version,
+                    self.sys_msg,
+                    self._sentence_prompt(sentence),
+                    explanation)
+                   for sentence, explanation in rows]
+        return get_gpt_cache().warm(entries)
 
     def explain_sentence_custom(self,
                                 sentence: str,
@@ -178,14 +721,55 @@ class GptExplainService:
         Returns:
             str: GPT-generated response
         """
+        template = prompt
         try:
             prompt = prompt.format(sentence)
         except Exception as e:
             logger.error(f"Couldn't format prompt : {e}")
             return None
-        model = GptModel(self.version, sysMsg)
-        result = model.request(prompt)
-        return result['response']
+        return self._request(sysMsg, prompt, sentence, scope=template)
+
+
+@lru_cache(maxsize=1)
+def get_gpt_explainer() -> GptExplainService:
+    """
+    Process-wide GptExplainService with the default model, so its GPT
+    clients are built once rather than per request.
+    """
+    return GptExplainService()
+
+
+BREAKDOWN_CACHE_SIZE = int(os.getenv("BREAKDOWN_CACHE_SIZE", "1024"))
+
+
+class ResultCache:
+    """
+    Small in-memory LRU for finished breakdowns and token lookups, so
+    a repeated sentence skips tokenizing, enrichment and the GPT cache.
+    """
+
+    def __init__(self, maxsize: int = BREAKDOWN_CACHE_SIZE):
+        self.maxsize = maxsize
+        self._data: "OrderedDict[Tuple, object]" = OrderedDict()
+
+    def get(self, key: Tuple):
+        value = self._data.get(key)
+        if value is not None:
+            try:
+                self._data.move_to_end(key)
+            except KeyError:
+                pass
+        return value
+
+    def put(self, key: Tuple, value) -> None:
+        if self.maxsize <= 0:
+            return
+        self._data[key] = value
+        while len(self._data) > self.maxsize:
+            try:
+                self._data.popitem(last=False)
+            except KeyError:
+                break
 
 
 class SentenceBreakdownService:
@@ -197,29 +781,87 @@ class SentenceBreakdownService:
     def __init__(self,
                  gpt_version: str = "gpt-4.1-mini",
                  gpt_kwargs: Dict = {}):
-        self.tokenizer = TokenizerService()
-        self.word_info = WordInfoService()
-        self.gpt_explainer = GptExplainService(gpt_model_kwargs=gpt_kwargs,
-                                               version=gpt_version)
+        # Services are built on first use, so dictionary-only callers
+        # never construct the GPT client and vice versa
+        self.gpt_version = gpt_version
+        self.gpt_kwargs = gpt_kwargs
+        self.results = ResultCache()
+
+    @cached_property
+    def tokenizer(self) -> TokenizerService:
+        return TokenizerService()
+
+    @cached_property
+    def word_info(self) -> WordInfoService:
+        return WordInfoService()
+
+    @cached_property
+    def gpt_explainer(self) -> GptExplainService:
+        return GptExplainService(gpt_model_kwargs=self.gpt_kwargs,
+                                 version=self.gpt_version)
 
     def word_lookup(self, sentence: str) -> List[Dict]:
+        key = ("lookup", sentence)
+        cached = self.results.get(key)
+        if cached is not None:
+            return cached
         tokens = self.tokenizer.tokenize(sentence)
 
+        # One bulk dictionary query for every distinct lemma
+        infos = self.word_info.lookup_many([t["lemma"] for t in tokens])
+        enriched = self._enrich(tokens, infos)
+        self.results.put(key, enriched)
+        return enriched
+
+    def _cached_breakdown(self, key: Tuple) -> Optional[Dict]:
+        cached = self.results.get(key)
+        # Shallow copy: callers may overwrite top-level keys
+        return dict(cached) if cached is not None else None
+
+    def _remember_breakdown(self, key: Tuple, result: Dict) -> Dict:
+        # Failed GPT calls come back empty; let those be retried
+        if result["gpt_explanation"]:
+            self.results.put(key, dict(result))
+        return result
+
+    def word_lookup_many(self, sentences: List[str]) -> List[List[Dict]]:
+        """
+        word_lookup for several sentences: one tagger pass and one bulk
+        dictionary query for all of them.
+        """
+        token_lists = self.tokenizer.tokenize_many(sentences)
+        infos = self.word_info.lookup_many(
+            [t["lemma"] for tokens in token_lists for t in tokens])
+        return [self._enrich(tokens, infos) for tokens in token_lists]
+
+    @staticmethod
+    def _enrich(tokens: List[Dict], infos: Dict[str, Dict]) -> List[Dict]:
         enriched_tokens: List[Dict] = []
+        append = enriched_tokens.append
+        # Particles and common verbs repeat within a sentence; resolve
+        # each distinct lemma's fields once and fan them out
+        fields: Dict[str, Tuple] = {}
         for token in tokens:
-            lemma = token.get("lemma") or ""
-            info = self.word_info.lookup(lemma)
-
-            enriched_tokens.append({
-                "surface": token.get("surface") or "",
+            lemma = token["lemma"] or ""
+            lemma_fields = fields.get(lemma)
+            if lemma_fields is None:
+                info = infos.get(lemma) or _empty_info(lemma)
+                # Safely fetch fields from FocusInfo
+                lemma_fields = fields[lemma] = (
+                    info.get("meanings", []),
+                    info.get("jlpt", "Unknown"),
+                    info.get("examples", []))
+            meanings, jlpt, examples = lemma_fields
+
+            append({
+                "surface": token["surface"] or "",
                 "lemma": lemma,
                 # Ensure reading is always a string
-                "reading": token.get("reading") or "",
-                "pos": token.get("pos") or "",
-                # Safely fetch fields from FocusInfo
-                "meanings": info.get("meanings", []),
-                "jlpt": info.get("jlpt", "Unknown"),
-                "examples": info.get("examples", []),
+                "reading": token["reading"] or "",
+                "pos": token["pos"] or "",
+                "meanings": meanings,
+                "jlpt": jlpt,
+                "examples": examples,
             })
         return enriched_tokens
 
@@ -235,6 +877,10 @@ class SentenceBreakdownService:
         Returns:
             Dict: Includes tokens, word info, and GPT breakdown
         """
+        key = ("explain", sentence, focus)
+        cached = self._cached_breakdown(key)
+        if cached is not None:
+            return cached
         enriched_tokens = self.word_lookup(sentence)
 
         # Generate GPT breakdown text
@@ -244,7 +890,7 @@ class SentenceBreakdownService:
             try:
                 focus_data = self.word_info.lookup(f_lemma)
             except ValueError:
-                focus_data = FocusInfo(
+                focus_data = FocusInfo.model_construct(
                     word=f_lemma,
                     reading="",
                     meanings=[],
@@ -253,20 +899,55 @@ class SentenceBreakdownService:
                 )
         else:
             gpt_text = self.gpt_explainer.explain_sentence(sentence)
-            focus_data = FocusInfo(
-                word="",
-                reading="",
-                meanings=[],
-                jlpt="",
-                examples=[],
-            )
+            focus_data = EMPTY_FOCUS
 
-        return {
+        return self._remember_breakdown(key, {
             "sentence": sentence,
             "focus": focus_data,
             "tokens": enriched_tokens,
             "gpt_explanation": gpt_text,
-        }
+        })
+
+    def _focus_info(self, focus: Optional[str]):
+        if not focus:
+            return EMPTY_FOCUS
+        try:
+            return self.word_info.lookup(focus)
+        except ValueError:
+            return FocusInfo.model_construct(word=focus,
+                                             reading="",
+                                             meanings=[],
+                                             jlpt="",
+                                             examples=[])
+
+    def explain_many(self,
+                     sentences: List[str],
+                     focuses: Optional[List[Optional[str]]] = None
+                     ) -> List[Dict]:
+        """
+        Breakdown several sentences, sending their GPT explanations as
+        batched requests.
+
+        Args:
+            sentences (List[str]): Japanese sentences to analyze.
+            focuses (List[Optional[str]]): Focus word per sentence, or
+            None to explain every sentence as a whole.
+
+        Returns:
+            List[Dict]: One breakdown per sentence, as returned by
+            `explain`.
+        """
+        focuses = focuses or [None] * len(sentences)
+        items = list(zip(sentences, focuses))
+        texts = self.gpt_explainer.explain_batch(items)
+        token_lists = self.word_lookup_many(sentences)
+        return [{
+            "sentence": sentence,
+            "focus": self._focus_info(focus),
+            "tokens": tokens,
+            "gpt_explanation": text,
+        } for (sentence, focus), text, tokens in zip(items, texts,
+                                                     token_lists)]
 
     def explain_custom(self,
                        sentence: str,
@@ -287,6 +968,10 @@ class SentenceBreakdownService:
         Returns:
             Dict: Includes tokens, word info, and GPT breakdown
         """
+        key = ("custom", sentence, sysMsg, prompt, focus)
+        cached = self._cached_breakdown(key)
+        if cached is not None:
+            return cached
         enriched_tokens = self.word_lookup(sentence)
 
         # Generate GPT breakdown text
@@ -299,7 +984,7 @@ class SentenceBreakdownService:
             try:
                 focus_data = self.word_info.lookup(f_lemma)
             except ValueError:
-                focus_data = FocusInfo(
+                focus_data = FocusInfo.model_construct(
                     word=f_lemma,
                     reading="",
                     meanings=[],
@@ -310,17 +995,11 @@ class SentenceBreakdownService:
             gpt_text = self.gpt_explainer.explain_sentence_custom(sentence,
                                                                   sysMsg,
                                                                   prompt)
-            focus_data = FocusInfo(
-                word="",
-                reading="",
-                meanings=[],
-                jlpt="",
-                examples=[],
-            )
+            focus_data = EMPTY_FOCUS
 
-        return {
+        return self._remember_breakdown(key, {
             "sentence": sentence,
             "focus": focus_data,
             "tokens": enriched_tokens,
             "gpt_explanation": gpt_text,
-        }
+        })
@@ -1,28 +1,318 @@
-from typing import Dict, Union
+from typing import (Dict, Union, NamedTuple, Optional, Iterator, Tuple,
+                    List)
 import logging
+import re
 import time
-from faster_whisper import WhisperModel
-import srt
-import datetime
+import os
+import asyncio
+from functools import lru_cache
+import inspect
+import io
+import json
+import shutil
+import subprocess
+import tempfile
+import wave
 from pathlib import Path
 from processing.gpt_wrapper import GptModel
 
+BACKENDS = ("faster-whisper", "torch-compile", "whisper.cpp")
+# int8 weights with fp16 activations: roughly 40% less VRAM than float16
+# at a WER cost that is typically under 0.3%, leaving room for larger
+# batches on the same GPU
+DEFAULT_COMPUTE_TYPE = os.getenv("WHISPER_COMPUTE_TYPE", "int8_float16")
+_BLANK_LINES = re.compile(r"\n\n+")
+# Audio no longer than one Whisper window gains nothing from the batched
+# pipeline, so it takes the sequential path
+BATCHED_MIN_SECONDS = float(os.getenv("WHISPER_BATCHED_MIN_SECONDS", "30"))
+VAD_PARAMETERS = {"min_silence_duration_ms": 500}
+
+
+def resolve_device(device: str) -> str:
+    """
+    Map "auto" onto "cuda" when a GPU is visible, else "cpu".
+    """
+    if device != "auto":
+        return device
+    try:
+        import ctranslate2
+        return "cuda" if ctranslate2.get_cuda_device_count() > 0 else "cpu"
+    except ImportError:
+        pass
+    try:
+        import torch
+        return "cuda" if torch.cuda.is_available() else "cpu"
+    except ImportError:
+        return "cpu"
+
+
+def _wav_duration(path: str) -> Optional[float]:
+    """
+    Duration of a WAV file read from its header, or None for other
+    formats.
+    """
+    try:
+        with wave.open(path, "rb") as w:
+            return w.getnframes() / float(w.getframerate())
+    except (wave.Error, EOFError, OSError, ZeroDivisionError):
+        return None
+
+
+def _format_timestamp(secs: float) -> str:
+    """
+    SRT "HH:MM:SS,mmm" timestamp using integer arithmetic. Rounds to
+    the microsecond and truncates to the millisecond like timedelta.
+    """
+    ms = round(secs * 1_000_000) // 1000
+    hh, ms = divmod(ms, 3_600_000)
+    mm, ms = divmod(ms, 60_000)
+    ss, ms = divmod(ms, 1000)
+    return f"{hh:02d}:{mm:02d}:{ss:02d},{ms:03d}"
+
+
+def _format_cue(index: int, start: float, end: float, text: str) -> str:
+    """
+    One SRT cue, byte-identical to srt.Subtitle(...).to_srt().
+    """
+    if not text or text[0] == "\n" or "\n\n" in text:
+        text = _BLANK_LINES.sub("\n", text.strip("\n"))
+    return (f"{index}\n{_format_timestamp(start)} --> "
+            f"{_format_timestamp(end)}\n{text}\n\n")
+
+
+class TranscriptSegment(NamedTuple):
+    """
+    Backend-agnostic segment with the same attributes the wrapper reads
+    from faster-whisper segments.
+    """
+    start: float
+    end: float
+    text: str
+
+
+class TorchCompileBackend:
+    """
+    Hugging Face Whisper with a static KV cache and a torch.compile'd
+    forward pass, so decoding replays captured CUDA graphs.
+    """
+    SAMPLING_RATE = 16000
+
+    def __init__(self,
+                 model_name: str = "large-v3",
+                 device: str = "cuda",
+                 warmup_steps: int = 3,
+                 max_new_tokens: int = 128) -> None:
+        import torch
+        from transformers import (AutoProcessor,
+                                  WhisperForConditionalGeneration)
+
+        self.logger = logging.getLogger(self.__class__.__name__)
+        self.torch = torch
+        torch._inductor.config.fx_graph_cache = True
+        model_id = model_name
+        if "/" not in model_id:
+            model_id = f"openai/whisper-{model_name}"
+        self.device = device
+        self.dtype = torch.float16 if device.startswith("cuda") \
+            else torch.float32
+        self.max_new_tokens = max_new_tokens
+        self.processor = AutoProcessor.from_pretrained(model_id)
+        self.model = WhisperForConditionalGeneration.from_pretrained(
+            model_id,
+            torch_dtype=self.dtype,
+            attn_implementation="sdpa").to(device)
+        self.model.generation_config.cache_implementation = "static"
+        self.model.forward = torch.compile(self.model.forward,
+                                           mode="reduce-overhead",
+                                           fullgraph=True)
+        self._warmup(warmup_steps)
+
+    def _warmup(self, steps: int) -> None:
+        """
+        Run fixed-shape dummy generations so the CUDA graphs are captured
+        before the first real request.
+        """
+        n_mels = self.model.config.num_mel_bins
+        dummy = self.torch.zeros((1, n_mels, 3000),
+                                 dtype=self.dtype,
+                                 device=self.device)
+        for _ in range(steps):
+            self.model.generate(dummy,
+                                min_new_tokens=self.max_new_tokens,
+                                max_new_tokens=self.max_new_tokens)
+        self.logger.info(f"Warmed up with {steps} compiled generate calls")
+
+    def transcribe(self,
+                   audio: str,
+                   language: str = "ja",
+                   **_) -> Tuple[Iterator[TranscriptSegment], Dict]:
+        from transformers.pipelines.audio_utils import ffmpeg_read
+        with open(audio, "rb") as f:
+            waveform = ffmpeg_read(f.read(), self.SAMPLING_RATE)
+        features = self.processor(waveform,
+                                  sampling_rate=self.SAMPLING_RATE,
+                                  return_tensors="pt",
+                                  truncation=False,
+                                  padding="longest",
+                                  return_attention_mask=True)
+        features = features.to(self.device, self.dtype)
+        out = self.model.generate(**features,
+                                  language=language,
+                                  task="transcribe",
+                                  return_timestamps=True,
+                                  return_segments=True)
+        segments = []
+        for seg in out["segments"][0]:
+            text = self.processor.decode(seg["tokens"],
+                                         skip_special_tokens=True)
+            segments.append(TranscriptSegment(start=float(seg["start"]),
+                                              end=float(seg["end"]),
+                                              text=text))
+        return iter(segments), {"language": language,
+                                "backend": "torch-compile"}
+
+    def transcribe_batch(self,
+                         audios: List[str],
+                         language: str = "ja"
+                         ) -> List[Tuple[Iterator[TranscriptSegment], Dict]]:
+        """
+        Pad several files into one feature batch and decode them with a
+        single generate call.
+        """
+        from transformers.pipelines.audio_utils import ffmpeg_read
+        waveforms = []
+        for audio in audios:
+            with open(audio, "rb") as f:
+                waveforms.append(ffmpeg_read(f.read(), self.SAMPLING_RATE))
+        features = self.processor(waveforms,
+                                  sampling_rate=self.SAMPLING_RATE,
+                                  return_tensors="pt",
+                                  truncation=False,
+                                  padding="longest",
+                                  return_attention_mask=True)
+        features = features.to(self.device, self.dtype)
+        out = self.model.generate(**features,
+                                  language=language,
+                                  task="transcribe",
+                                  return_timestamps=True,
+                                  return_segments=True)
+        results = []
+        for file_segments in out["segments"]:
+            segments = [
+                TranscriptSegment(
+                    start=float(seg["start"]),
+                    end=float(seg["end"]),
+                    text=self.processor.decode(seg["tokens"],
+                                               skip_special_tokens=True))
+                for seg in file_segments
+            ]
+            results.append((iter(segments), {"language": language,
+                                             "backend": "torch-compile"}))
+        return results
+
+
+class WhisperCppBackend:
+    """
+    whisper.cpp CPU build (AVX/NEON, flash attention) run as a
+    subprocess on a quantized ggml model.
+    """
+    def __init__(self,
+                 model_path: Optional[str] = None,
+                 binary: str = "whisper-cli",
+                 threads: Optional[int] = None,
+                 flash_attn: bool = True) -> None:
+        self.logger = logging.getLogger(self.__class__.__name__)
+        self.binary = shutil.which(binary)
+        self.ffmpeg = shutil.which("ffmpeg")
+        if not self.binary:
+            raise EnvironmentError(f"whisper.cpp binary '{binary}' not found")
+        if not self.ffmpeg:
+            raise EnvironmentError("FFmpeg not found.")
+        self.model_path = model_path or os.getenv(
+            "WHISPER_CPP_MODEL", "models/ggml-large-v3-q5_0.bin")
+        if not Path(self.model_path).is_file():
+            raise FileNotFoundError(f"ggml model '{self.model_path}' missing")
+        self.threads = threads or os.cpu_count() or 1
+        self.flash_attn = flash_attn
+
+    def transcribe(self,
+                   audio: str,
+                   language: str = "ja",
+                   **_) -> Tuple[Iterator[TranscriptSegment], Dict]:
+        with tempfile.TemporaryDirectory(prefix="whispercpp_") as tmp:
+            wav = Path(tmp) / "audio.wav"
+            out_stem = Path(tmp) / "out"
+            # whisper.cpp expects 16 kHz mono PCM
+            subprocess.run([self.ffmpeg, "-y", "-i", str(audio),
+                            "-ar", "16000", "-ac", "1",
+                            "-c:a", "pcm_s16le", str(wav)],
+                           check=True,
+                           capture_output=True)
+            cmd = [self.binary,
+                   "-m", self.model_path,
+                   "-f", str(wav),
+                   "-l", language,
+                   "-t", str(self.threads),
+                   "-oj",
+                   "-of", str(out_stem)]
+            if self.flash_attn:
+                cmd.append("-fa")
+            subprocess.run(cmd, check=True, capture_output=True)
+            data = json.loads(out_stem.with_suffix(".json").read_text(
+                encoding="utf-8"))
+        segments = [
+            TranscriptSegment(start=item["offsets"]["from"] / 1000,
+                              end=item["offsets"]["to"] / 1000,
+                              text=item["text"])
+            for item in data.get("transcription", [])
+        ]
+        return iter(segments), {"language": language,
+                                "backend": "whisper.cpp"}
+
 
 class FWhisperWrapper:
     def __init__(self,
                  model_name: str = 'large-v3',
                  lang: str = 'ja',
-                 compute_type: str = "float16",
+                 compute_type: str = DEFAULT_COMPUTE_TYPE,
                  device: str = 'cuda',
                  gpt_sys_msg: str = None,
-                 gpt_version: str = 'gpt-4.1'
+                 gpt_version: str = 'gpt-4.1',
+                 backend: str = 'faster-whisper',
+                 backend_kwargs: Optional[Dict] = None,
+                 batch_size: Optional[int] = None
                  ) -> None:
 
         self.logger = logging.getLogger(self.__class__.__name__)
         self.lang = lang
-        self.instance = WhisperModel(model_name,
-                                     device=device,
-                                     compute_type=compute_type)
+        if backend not in BACKENDS:
+            raise ValueError(f"Unknown backend '{backend}', "
+                             f"expected one of {BACKENDS}")
+        backend_kwargs = backend_kwargs or {}
+        device = resolve_device(device)
+        if device == "cpu" and "float16" in compute_type:
+            # CPUs have no fast fp16 path; int8 is CTranslate2's
+            # quickest CPU mode
+            self.logger.info(f"compute_type {compute_type} -> int8 on CPU")
+            compute_type = "int8"
+        if backend == "torch-compile":
+            self.instance = TorchCompileBackend(model_name=model_name,
+                                                device=device,
+                                                **backend_kwargs)
+        elif backend == "whisper.cpp":
+            self.instance = WhisperCppBackend(**backend_kwargs)
+        else:
+            from faster_whisper import WhisperModel
+            self.instance = WhisperModel(model_name,
+                                         device=device,
+                                         compute_type=compute_type)
+        # Batched pipeline decodes VAD chunks of one file in parallel
+        self.pipeline = None
+        self.batch_size = batch_size
+        if batch_size and backend == "faster-whisper":
+            from faster_whisper import BatchedInferencePipeline
+            self.pipeline = BatchedInferencePipeline(model=self.instance)
+        self.backend = backend
         self.device = device
         self.model_name = model_name
         self.gpt_version = gpt_version
@@ -92,11 +382,15 @@ class FWhisperWrapper:
                    audio_path: str,
                    language: str = "ja",
                    generator_only: bool = False,
-                   add_kargs: dict = {}) -> Union[Dict,
-                                                  None]:
+                   add_kargs: dict = {},
+                   batched: Optional[bool] = None) -> Union[Dict,
+                                                            None]:
         """
         Transcribe audio and return a list of segment objects.
         Each segment has .start, .end, .text, and optionally .words.
+        `batched` picks the batched pipeline (when loaded); by default
+        it is used unless the audio is a WAV of at most
+        BATCHED_MIN_SECONDS.
         """
 
         audio_path = self._check_input(audio_path)
@@ -118,8 +412,25 @@ class FWhisperWrapper:
 
         if add_kargs:
             add_kwds.update(add_kargs)
+        if self.pipeline is None:
+            batched = False
+        elif batched is None:
+            duration = _wav_duration(audio_path)
+            batched = duration is None or duration > BATCHED_MIN_SECONDS
         try:
-            segments, info = self.instance.transcribe(** add_kwds)
+            if self.backend != "faster-whisper":
+                # Alternate engines only honour audio + language
+                segments, info = self.instance.transcribe(
+                    audio_path,
+                    language=add_kwds['language'])
+            elif batched:
+                add_kwds['vad_filter'] = True
+                add_kwds.setdefault('vad_parameters', VAD_PARAMETERS)
+                segments, info = self.pipeline.transcribe(
+                    batch_size=self.batch_size,
+                    ** add_kwds)
+            else:
+                segments, info = self.instance.transcribe(** add_kwds)
             if generator_only:
                 return {'obj': segments,
                         'info': info}
@@ -151,6 +462,36 @@ class FWhisperWrapper:
             self.logger.error(f"Error when generating str transcript: {e}")
             return None
 
+    def transcribe_many_to_str(self,
+                               audio_paths: List[str]
+                               ) -> List[Union[Dict, None]]:
+        """
+        Transcribe several files in one call. Backends with a batched
+        decoder get a single forward pass; faster-whisper has no
+        cross-file batch API so files run back-to-back on the model.
+        """
+        batch_fn = getattr(self.instance, "transcribe_batch", None)
+        if batch_fn is None or len(audio_paths) == 1:
+            return [self.transcribe_to_str(p) for p in audio_paths]
+        checked = [self._check_input(p) for p in audio_paths]
+        results: List[Union[Dict, None]] = [None] * len(audio_paths)
+        valid = [i for i, p in enumerate(checked) if p]
+        if not valid:
+            return results
+        try:
+            start = time.perf_counter()
+            batch = batch_fn([checked[i] for i in valid], language=self.lang)
+            elapsed = time.perf_counter() - start
+        except Exception as e:
+            self.logger.error(f"Batched transcription failed: {e}")
+            return [self.transcribe_to_str(p) for p in audio_paths]
+        for i, (segments, _info) in zip(valid, batch):
+            segments = list(segments)
+            results[i] = {"obj": segments,
+                          "text": "。".join(seg.text for seg in segments),
+                          "elapsed": elapsed}
+        return results
+
     def transcribe_to_srt(self,
                           audio_path: str,
                           output_path: str,
@@ -168,25 +509,42 @@ class FWhisperWrapper:
         except Exception as e:
             self.logger.error(f"Error cleaning output path : {e}")
             return None
+        # Without GPT the cues go straight to the caller's file; with GPT
+        # the raw cues are kept for the request and side-written to
+        # nogpt.srt as they arrive
+        buf = io.StringIO()
+        sinks = [buf.write]
+        out_f = None
         try:
-            segments = self.transcribe(audio_path, **transcribe_kwargs)
-            segments = segments['obj']
-            subtitles = []
-            for i, seg in enumerate(segments, start=1):
-                start = datetime.timedelta(seconds=seg.start)
-                end = datetime.timedelta(seconds=seg.end)
-                subtitles.append(srt.Subtitle(index=i,
-                                              start=start,
-                                              end=end,
-                                              content=seg.text))
+            if not string_result:
+                target = (opath.parent / "nogpt.srt" if fix_with_chat_gpt
+                          else output_path)
+                out_f = open(target, "w", encoding="utf-8")
+                sinks = [out_f.write]
+                if fix_with_chat_gpt:
+                    sinks.append(buf.write)
+            rdict = self.transcribe(audio_path,
+                                    **{"generator_only": True,
+                                       **transcribe_kwargs})
+            index = 0
+            for seg in rdict['obj']:
+                # Empty cues are dropped and the rest renumbered
+                if not seg.text.strip():
+                    continue
+                index += 1
+                cue = _format_cue(index, seg.start, seg.end, seg.text)
+                for write in sinks:
+                    write(cue)
         except Exception as e:
             self.logger.error(f"Error when generating SRT: {e}")
             return None
+        finally:
+            if out_f is not None:
+                out_f.close()
 
         if fix_with_chat_gpt:
             try:
-                rsrt = self.gpt_fix_srt(srt.compose(subtitles),
-                                        gpt_model_kwargs)
+                rsrt = self.gpt_fix_srt(buf.getvalue(), gpt_model_kwargs)
                 if not rsrt:
                     return None
 
@@ -194,10 +552,6 @@ class FWhisperWrapper:
                     self.logger.info("Generated SRT")
                     return rsrt
 
-                with open(opath.parent / "nogpt.srt", "w", encoding="utf-8"
-                          ) as f:
-                    f.write(srt.compose(subtitles))
-
                 with open(output_path, "w", encoding="utf-8") as f:
                     f.write(rsrt)
 
@@ -207,16 +561,115 @@ class FWhisperWrapper:
             except Exception as e:
                 self.logger.error(f"Error Writing SRT File: {e}")
                 return None
-        else:
+        self.logger.info("Generated SRT")
+        return buf.getvalue() if string_result else output_path
+
+
+@lru_cache(maxsize=4)
+def _cached_fwhisper(frozen_kwargs: frozenset) -> FWhisperWrapper:
+    return FWhisperWrapper(**dict(frozen_kwargs))
+
+
+def get_shared_fwhisper(**whisper_kwargs) -> FWhisperWrapper:
+    """
+    Return a process-wide FWhisperWrapper for these kwargs, loading the
+    model only the first time a given configuration is requested.
+    """
+    # Fill in defaults so {} and the equivalent explicit kwargs share
+    bound = inspect.signature(FWhisperWrapper).bind(**whisper_kwargs)
+    bound.apply_defaults()
+    try:
+        return _cached_fwhisper(frozenset(bound.arguments.items()))
+    except TypeError:
+        # Unhashable kwargs (e.g. backend_kwargs dict) can't be cached
+        return FWhisperWrapper(**whisper_kwargs)
+
+
+class BatchingFWhisper:
+    """
+    Queue in front of a shared FWhisperWrapper that coalesces concurrent
+    transcription requests into one model call. Only the torch-compile
+    backend has a cross-file batch decoder; the others, including the
+    default faster-whisper, bypass the queue and this is a plain
+    worker-thread call: their "batch" would only run the files back to
+    back and make every caller wait for the last one.
+    """
+    def __init__(self,
+                 model: FWhisperWrapper,
+                 max_batch_size: int = 8,
+                 batch_window: float = 0.005) -> None:
+        self.logger = logging.getLogger(self.__class__.__name__)
+        self.model = model
+        self.max_batch_size = max_batch_size
+        self.batch_window = batch_window
+        self.can_batch = hasattr(model.instance, "transcribe_batch")
+        self._q: Optional[asyncio.Queue] = None
+        self._worker_task: Optional[asyncio.Task] = None
+
+    async def start(self) -> None:
+        if not self.can_batch:
+            self.logger.info("Backend can't batch; transcribing directly")
+            return
+        self._q = asyncio.Queue()
+        self._worker_task = asyncio.create_task(self._worker())
+        self.logger.info(f"Batching up to {self.max_batch_size} requests")
+
+    async def stop(self) -> None:
+        if self._worker_task is not None:
+            self._worker_task.cancel()
             try:
-                if string_result:
-                    self.logger.info("Generated SRT")
-                    return srt.compose(subtitles)
+                await self._worker_task
+            except asyncio.CancelledError:
+                pass
+            self._worker_task = None
+        # Fail anything still waiting so callers don't hang on shutdown
+        while self._q is not None and not self._q.empty():
+            _, fut = self._q.get_nowait()
+            if not fut.done():
+                fut.set_result(None)
 
-                with open(output_path, "w", encoding="utf-8") as f:
-                    f.write(srt.compose(subtitles))
-                self.logger.info("Generated SRT")
-                return output_path
+    async def transcribe_to_str(self,
+                                audio_path: str) -> Union[Dict, None]:
+        if not self.can_batch:
+            return await asyncio.to_thread(self.model.transcribe_to_str,
+                                           str(audio_path))
+        fut = asyncio.get_running_loop().create_future()
+        await self._q.put((str(audio_path), fut))
+        return await fut
+
+    async def _collect(self) -> List[Tuple[str, asyncio.Future]]:
+        """
+        Block for one request, then keep draining the queue until the
+        batch is full or the batch window closes.
+        """
+        loop = asyncio.get_running_loop()
+        batch = [await self._q.get()]
+        deadline = loop.time() + self.batch_window
+        while len(batch) < self.max_batch_size:
+            timeout = deadline - loop.time()
+            if timeout <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self._q.get(), timeout))
+            except asyncio.TimeoutError:
+                break
+        return batch
+
+    async def _worker(self) -> None:
+        while True:
+            batch = await self._collect()
+            paths = [path for path, _ in batch]
+            try:
+                results = await asyncio.to_thread(
+                    self.model.transcribe_many_to_str, paths)
             except Exception as e:
-                self.logger.error(f"Failed to save SRT File : {e}")
-                return None
+                self.logger.error(f"Batch of {len(paths)} failed: {e}")
+                results = [None] * len(batch)
+            if len(results) != len(batch):
+                # Never leave a caller waiting on a missing result
+                self.logger.error(f"Batch of {len(batch)} returned "
+                                  f"{len(results)} results")
+                results = (list(results) + [None] * len(batch))[:len(batch)]
+            for (_, fut), result in zip(batch, results):
+                if not fut.done():
+                    fut.set_result(result)
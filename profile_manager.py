@@ -1,11 +1,38 @@
 from fastapi import Header, HTTPException, Depends, status
-from db.db import get_db
+from db.db import get_db, profile_exists_db
 from db.Tables import profiles
 import logging
+import os
+import time
+from collections import OrderedDict
 from typing import Optional
 
 logger = logging.getLogger(__name__)
 
+PROFILE_CACHE_TTL = float(os.getenv("PROFILE_CACHE_TTL", "300"))
+PROFILE_CACHE_SIZE = int(os.getenv("PROFILE_CACHE_SIZE", "10000"))
+# Profile IDs confirmed to exist -> monotonic time they were confirmed.
+# Profiles are never deleted, so the TTL only bounds staleness if the
+# database is swapped underneath a running process.
+_seen_profiles: "OrderedDict[str, float]" = OrderedDict()
+
+
+def _recently_seen(profile_id: str) -> bool:
+    seen_at = _seen_profiles.get(profile_id)
+    if seen_at is None:
+        return False
+    if time.monotonic() - seen_at >= PROFILE_CACHE_TTL:
+        _seen_profiles.pop(profile_id, None)
+        return False
+    return True
+
+
+def _mark_seen(profile_id: str) -> None:
+    _seen_profiles[profile_id] = time.monotonic()
+    _seen_profiles.move_to_end(profile_id)
+    while len(_seen_profiles) > PROFILE_CACHE_SIZE:
+        _seen_profiles.popitem(last=False)
+
 
 async def get_profile_id_from_header(x_profile_id: str = Header(None)
                                      ) -> Optional[str]:
@@ -27,11 +54,11 @@ async def ensure_profile_exists(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="X-Profile-ID header is required for this operation."
         )
+    if _recently_seen(profile_id):
+        return profile_id
 
     db = await get_db()
-    query = profiles.select().where(profiles.c.id == profile_id)
-    profile = await db.fetch_one(query)
-    if not profile:
+    if not await profile_exists_db(profile_id):
         try:
             insert_query = profiles.insert().values(id=profile_id,
                                                     name=profile_id)
@@ -40,11 +67,11 @@ async def ensure_profile_exists(
         except Exception as e:
             logger.error(f"Error creating profile {profile_id}: {e}")
             # Check if it was created by another request in the meantime
-            profile_check_after_error = await db.fetch_one(query)
-            if not profile_check_after_error:
+            if not await profile_exists_db(profile_id):
                 raise HTTPException(
                     status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
                     detail=f"Could not create or find profile {profile_id}.")
+    _mark_seen(profile_id)
     return profile_id
 
 
@@ -55,12 +82,12 @@ async def get_profile_id_optional(
     exists (implicitly creates if new). Returns None if header is missing."""
     if not profile_id:
         return None
+    if _recently_seen(profile_id):
+        return profile_id
 
     # If header is provided, ensure profile exists (or create it)
     db = await get_db()
-    query = profiles.select().where(profiles.c.id == profile_id)
-    profile = await db.fetch_one(query)
-    if not profile:
+    if not await profile_exists_db(profile_id):
         try:
             insert_query = profiles.insert().values(id=profile_id,
                                                     name=profile_id)
@@ -71,10 +98,10 @@ async def get_profile_id_optional(
             logger.error(f"Error creating profile {profile_id} \
                 (optional context): {e}")
             # Check again in case of race condition
-            profile_check_after_error = await db.fetch_one(query)
-            if not profile_check_after_error:
+            if not await profile_exists_db(profile_id):
                 # Don't raise 500 here, as profile is optional.
                 logger.error(f"Could not find or create profile \
                     {profile_id} (optional context) after error.")
                 return None
+    _mark_seen(profile_id)
     return profile_id
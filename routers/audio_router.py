@@ -1,7 +1,11 @@
+import asyncio
+import hashlib
 import logging
+import os
 import shutil
-import uuid
+import secrets
 from pathlib import Path
+from typing import Optional
 
 # FastAPI and Pydantic
 from fastapi import (
@@ -15,19 +19,19 @@ from fastapi import (
 )
 
 # Project-specific modules
-from processing.audio_processing import AudioTools
-from processing.text_processing import GptExplainService
+from processing.audio_processing import get_audio_tools
+from processing.text_processing import get_gpt_explainer
 from profile_manager import ensure_profile_exists
+from model_manager import get_fwhisper_batcher
 from db.db import get_db
 from db.Tables import profile_transcripts, profile_files
 from processing.Processor import Processor
+from utils.upload_utils import save_upload
+from utils.id_utils import new_id
 from utils.env_utils import using_modal
-import asyncio
+from utils.tmp_utils import ensure_dir
 USING_MODAL = using_modal()
 
-if not USING_MODAL:
-    from processing.whisper_wrapper import FWhisperWrapper
-    fwhisper = FWhisperWrapper()
 
 logger = logging.getLogger(__name__)
 audio_router = APIRouter(prefix="/audio")
@@ -39,6 +43,46 @@ TEMP_DIR.mkdir(parents=True, exist_ok=True)
 if USING_MODAL:
     processor = Processor(save_path=TEMP_DIR, use_modal=True)
 
+_Q_TRANSCRIPT_BY_SHA = ("SELECT id, transcript, gpt_explanation "
+                        "FROM profile_transcripts "
+                        "WHERE profile_id = ? AND audio_sha = ? "
+                        "ORDER BY created_at DESC LIMIT 1")
+_Q_SET_GPT_EXPLANATION = ("UPDATE profile_transcripts "
+                          "SET gpt_explanation = ? WHERE id = ?")
+
+
+# Placeholder explanations. Older rows may hold the failure text itself,
+# with varying whitespace from the old line continuations, so stored
+# values are matched on these prefixes (main.py shares them).
+GPT_FAILED_PREFIX = "Failed to generate GPT"
+GPT_EMPTY_PREFIX = "Transcript content empty"
+GPT_PLACEHOLDERS = (GPT_FAILED_PREFIX, GPT_EMPTY_PREFIX)
+# Returned to the client when the GPT request fails; stored as NULL so
+# a re-upload of the same audio retries it
+_GPT_FAILED = f"{GPT_FAILED_PREFIX} explanation."
+
+
+def _gpt_explanation(transcript: str, profile_id: str) -> Optional[str]:
+    """
+    GPT explanation for a transcript, a placeholder message when the
+    transcript is empty, or None when the request fails.
+    """
+    if not transcript.strip():
+        logger.warning(f"Skipping GPT for\
+            empty transcript (Profile: {profile_id})")
+        return f"{GPT_EMPTY_PREFIX}, no explanation."
+    gpt_explainer = get_gpt_explainer()
+    try:
+        logger.info(f"Generating GPT \
+            explanation (Profile: {profile_id})")
+        explanation = gpt_explainer.explain_sentence(sentence=transcript)
+        logger.info(f"GPT explanation\
+            generated (Profile: {profile_id})")
+        return explanation
+    except Exception as e_gpt:
+        logger.error(f"GPT explanation failed: {e_gpt}")
+        return None
+
 
 @audio_router.post("/transcribe_from_audio")
 async def transcribe_from_audio(
@@ -46,6 +90,7 @@ async def transcribe_from_audio(
     clean_audio_str: str = Form("false", alias="clean_audio"),
     gpt_explain_str: str = Form("false", alias="gpt_explain"),
     profile_id: str = Depends(ensure_profile_exists),
+    fwhisper_batcher=Depends(get_fwhisper_batcher),
 ):
     if not profile_id:
         raise HTTPException(
@@ -56,36 +101,64 @@ async def transcribe_from_audio(
     do_clean_audio = clean_audio_str.lower() == "true"
     do_gpt_explain = gpt_explain_str.lower() == "true"
 
-    op_id = str(uuid.uuid4())
+    op_id = secrets.token_hex(16)
     op_tmp_dir = TEMP_DIR / f"transcribe_audio_{profile_id}_{op_id}"
     op_tmp_dir.mkdir(parents=True, exist_ok=True)
 
     prof_audio_dir = PROFILES_DIR / profile_id / "audios"
-    prof_audio_dir.mkdir(parents=True, exist_ok=True)
+    ensure_dir(prof_audio_dir)
 
     original_filename = file.filename
     persistent_audio_fname = f"{op_id}_{original_filename}"
+    if do_clean_audio:
+        # Cleaned audio is written straight to storage as WAV
+        persistent_audio_fname = (
+            f"{op_id}_{Path(original_filename).stem}.wav")
     final_audio_storage_loc = prof_audio_dir / persistent_audio_fname
     rel_audio_path_db = (
         Path("profiles") / profile_id / "audios" / persistent_audio_fname
     )
 
     tmp_uploaded_audio_loc = op_tmp_dir / original_filename
-    audio_to_process_loc = tmp_uploaded_audio_loc
+    gpt_task = None
 
     try:
-        with open(tmp_uploaded_audio_loc, "wb+") as f_obj:
-            shutil.copyfileobj(file.file, f_obj)
+        # Hash while saving so a re-upload of the same audio (with the
+        # same cleaning flag) is served from the stored transcript
+        hasher = hashlib.blake2b(digest_size=16,
+                                 person=b"clean" if do_clean_audio
+                                 else b"raw")
+        await save_upload(file, tmp_uploaded_audio_loc, hasher)
         logger.info(f"Temp audio for transcription: {tmp_uploaded_audio_loc}")
+        audio_sha = hasher.hexdigest()
 
-        if do_clean_audio:
-            audio_tools = AudioTools(working_dir=op_tmp_dir)
-            cleaned_audio_name = f"cleaned_{op_id}_{original_filename}.wav"
-            cleaned_audio_tmp_loc = op_tmp_dir / cleaned_audio_name
+        db = await get_db()
+        cached = await db.fetch_one(_Q_TRANSCRIPT_BY_SHA,
+                                    (profile_id, audio_sha))
+        if cached is not None:
+            logger.info(f"Reusing transcript {cached.id} for identical \
+                audio (Profile: {profile_id})")
+            gpt_explanation_text = None
+            if do_gpt_explain:
+                gpt_explanation_text = cached.gpt_explanation
+                if (gpt_explanation_text is None
+                        or gpt_explanation_text.startswith(
+                            GPT_FAILED_PREFIX)):
+                    gpt_explanation_text = await asyncio.to_thread(
+                        _gpt_explanation, cached.transcript, profile_id)
+                    await db.execute(_Q_SET_GPT_EXPLANATION,
+                                     (gpt_explanation_text, cached.id))
+                gpt_explanation_text = gpt_explanation_text or _GPT_FAILED
+            return {
+                "transcript": cached.transcript,
+                "gpt_explanation": gpt_explanation_text,
+            }
 
-            cleaned_path_str = audio_tools.filter_audio(
+        if do_clean_audio:
+            audio_tools = get_audio_tools()
+            cleaned_path_str = await audio_tools.filter_audio_async(
                 input_path=str(tmp_uploaded_audio_loc),
-                output_wav=str(cleaned_audio_tmp_loc),
+                output_wav=str(final_audio_storage_loc),
             )
             if not cleaned_path_str or not Path(cleaned_path_str).exists():
                 logger.error(f"Audio cleaning failed for \
@@ -94,13 +167,19 @@ async def transcribe_from_audio(
                     status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
                     detail="Audio cleaning process failed.",
                 )
-            audio_to_process_loc = Path(cleaned_path_str)
-            logger.info(f"Audio cleaned: {audio_to_process_loc}")
-
-        shutil.copyfile(audio_to_process_loc, final_audio_storage_loc)
+            logger.info(f"Audio cleaned: {final_audio_storage_loc}")
+        else:
+            # Temp and profile dirs share media_files, so this is a
+            # rename rather than a copy
+            try:
+                os.replace(tmp_uploaded_audio_loc, final_audio_storage_loc)
+            except OSError:
+                await asyncio.to_thread(shutil.copyfile,
+                                        tmp_uploaded_audio_loc,
+                                        final_audio_storage_loc)
         logger.info(
             f"Audio ({'cleaned' if do_clean_audio else 'original'}) "
-            f"copied to persistent: {final_audio_storage_loc}"
+            f"stored at: {final_audio_storage_loc}"
         )
         # When MODAL env variables are available use MODAL
         if USING_MODAL:
@@ -113,9 +192,8 @@ async def transcribe_from_audio(
         else:
             logger.info("Running Locally")
             logger.info(f"Audio Filepath: {final_audio_storage_loc}")
-            transcription_data = await asyncio.to_thread(
-                fwhisper.transcribe_to_str,
-                audio_path=str(final_audio_storage_loc)
+            transcription_data = await fwhisper_batcher.transcribe_to_str(
+                str(final_audio_storage_loc)
             )
         if not transcription_data or "text" not in transcription_data:
             logger.error(
@@ -133,41 +211,21 @@ async def transcribe_from_audio(
             generated for profile {profile_id}")
         gpt_explanation_text = None
         if do_gpt_explain:
-            if not plain_text_transcript.strip():
-                logger.warning(f"Skipping GPT for\
-                    empty transcript (Profile: {profile_id})")
-                gpt_explanation_text = "Transcript content empty,\
-                    no explanation."
-            else:
-                gpt_explainer = GptExplainService()
-                try:
-                    logger.info(f"Generating GPT \
-                        explanation (Profile: {profile_id})")
-                    gpt_explanation_text = gpt_explainer.explain_sentence(
-                        sentence=plain_text_transcript
-                    )
-                    logger.info(f"GPT explanation\
-                        generated (Profile: {profile_id})")
-                except Exception as e_gpt:
-                    logger.error(f"GPT explanation failed: {e_gpt}")
-                    gpt_explanation_text = "Failed to generate GPT \
-                        explanation."
-        db = await get_db()
-        transcript_id = str(uuid.uuid4())
+            # Only needs the transcript: start it now and persist the
+            # rows while it runs, filling the explanation in afterwards
+            gpt_task = asyncio.create_task(asyncio.to_thread(
+                _gpt_explanation, plain_text_transcript, profile_id))
+        transcript_id = new_id()
 
         ins_transcript_q = profile_transcripts.insert().values(
             id=transcript_id,
             profile_id=profile_id,
             original_file_name=original_filename,
             transcript=plain_text_transcript,
-            gpt_explanation=gpt_explanation_text,
             audio_file_path=str(rel_audio_path_db),
+            audio_sha=audio_sha,
         )
-        await db.execute(ins_transcript_q)
-        logger.info(f"Transcript {transcript_id} (plain text) \
-            saved (Profile: {profile_id})")
-
-        audio_file_rec_id = str(uuid.uuid4())
+        audio_file_rec_id = new_id()
         ins_audio_file_q = profile_files.insert().values(
             id=audio_file_rec_id,
             profile_id=profile_id,
@@ -176,9 +234,21 @@ async def transcribe_from_audio(
             file_type="audio_source",
             related_transcript_id=transcript_id,
         )
-        await db.execute(ins_audio_file_q)
+        # Both rows on one connection, committed together
+        async with db.transaction():
+            await db.execute(ins_transcript_q)
+            await db.execute(ins_audio_file_q)
+        logger.info(f"Transcript {transcript_id} (plain text) \
+            saved (Profile: {profile_id})")
         logger.info(f"Audio source record {audio_file_rec_id}\
             saved (Profile: {profile_id})")
+        if gpt_task is not None:
+            gpt_explanation_text = await gpt_task
+            if gpt_explanation_text is not None:
+                await db.execute(_Q_SET_GPT_EXPLANATION,
+                                 (gpt_explanation_text, transcript_id))
+            else:
+                gpt_explanation_text = _GPT_FAILED
 
         return {
             "transcript": plain_text_transcript,
@@ -203,6 +273,11 @@ async def transcribe_from_audio(
             detail=f"Failed to transcribe audio: {str(e)}",
         )
     finally:
+        if gpt_task is not None and not gpt_task.done():
+            # Persisting failed: stop waiting on the explanation. The
+            # worker thread can't be interrupted, but its answer still
+            # lands in the GPT response cache for a retried upload.
+            gpt_task.cancel()
         if op_tmp_dir.exists():
             try:
                 shutil.rmtree(op_tmp_dir)
@@ -1,12 +1,12 @@
 from fastapi import APIRouter, Query, HTTPException
+from fastapi.responses import ORJSONResponse
+import asyncio
 import logging
-from processing.Processor import Processor
-from utils.env_utils import using_modal
+from processing.Processor import get_processor
 
-USING_MODAL = using_modal()
 logger = logging.getLogger(__name__)
 dict_router = APIRouter(prefix="/dict")
-processor = Processor(use_modal=USING_MODAL)
+processor = get_processor()
 breakdown_service = processor.sentence_breakdown_service
 
 
@@ -16,8 +16,11 @@ async def explain_sentence(sentence: str = Query(...)):
     Endpoint returning enriched tokens without gpt explanation
     """
     try:
-        tokens = breakdown_service.word_lookup(sentence)
-        return {"sentence": sentence, "tokens": tokens}
+        tokens = await asyncio.to_thread(breakdown_service.word_lookup,
+                                         sentence)
+        # Plain str/list payload: hand it straight to orjson instead of
+        # walking every token through jsonable_encoder first
+        return ORJSONResponse({"sentence": sentence, "tokens": tokens})
 
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
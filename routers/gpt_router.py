@@ -1,33 +1,66 @@
 # gpt_router.py
+import asyncio
 import logging
-import re
 import time
 from fastapi import (APIRouter,
                      Query,
                      HTTPException,
                      Depends,
                      status)
-from fastapi.responses import StreamingResponse
+from fastapi.responses import ORJSONResponse, StreamingResponse
 from typing import Optional
 
-from processing.Processor import Processor
+from processing.Processor import get_processor
 from models.ChatRequest import ChatRequest
 from models.BreakdownRequest import BreakdownRequest
 from models.BreakdownResponse import BreakdownResponse
 from models.CustomBreakdownRequest import CustomBreakdownRequest
 from utils.stream_utils import sse_gen
 from profile_manager import get_profile_id_optional
-from utils.env_utils import using_modal
 
-USING_MODAL = using_modal()
 logger = logging.getLogger(__name__)
+# Deletes fullwidth parentheses before a retry
+_STRIP_PARENS = str.maketrans("", "", "（）")
 
-processor = Processor(use_modal=USING_MODAL)
+processor = get_processor()
 breakdown_service = processor.sentence_breakdown_service
 
 gpt_router = APIRouter(prefix='/gpt')
 
 
+async def _explain_with_retry(fn, sentence: str, *args, log_prefix: str = ""):
+    """
+    Run a breakdown on a worker thread, retrying once with the sentence
+    stripped of fullwidth parentheses if it fails. The retry is only
+    started after a failure: a running GPT call can't be cancelled, so
+    a speculative one would be billed even when unused.
+    """
+    t0 = time.perf_counter()
+    try:
+        result = await asyncio.to_thread(fn, sentence, *args)
+        elapsed = (time.perf_counter() - t0) * 1000
+        logger.info(f"{log_prefix}Request Time: {elapsed:.1f} ms")
+        return result
+    except Exception as e:
+        logger.warning(f"{log_prefix}Breakdown Failed: {e}")
+    cleaned = sentence.translate(_STRIP_PARENS)
+    logger.info(f"{log_prefix}Retrying with clean sentence: {cleaned!r}")
+    try:
+        t0 = time.perf_counter()
+        result = await asyncio.to_thread(fn, cleaned, *args)
+        elapsed = (time.perf_counter() - t0) * 1000
+        logger.info(f"{log_prefix}Retry Request Time: {elapsed:.1f} ms")
+        result_dict = result if isinstance(result, dict) \
+            else result.model_dump()
+        result_dict["sentence"] = sentence
+        return result_dict
+    except Exception as e2:
+        logger.exception(f"{log_prefix}Retry failed")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=str(e2))
+
+
 @gpt_router.post("/breakdown", response_model=BreakdownResponse)
 async def breakdown(
     req: BreakdownRequest,
@@ -36,30 +69,9 @@ async def breakdown(
     log_prefix = f"[Profile: {profile_id}] " if profile_id else ""
     logger.info(f"{log_prefix}Breakdown Request: \
         sentence={req.sentence!r} focus={req.focus!r}")
-    try:
-        t0 = time.perf_counter()
-        result = breakdown_service.explain(req.sentence, req.focus)
-        elapsed = (time.perf_counter() - t0) * 1000
-        logger.info(f"{log_prefix}Request Time: {elapsed:.1f} ms")
-        return result
-    except Exception as e:
-        logger.warning(f"{log_prefix}Breakdown Failed: {e}")
-        cleaned = re.sub(r"[（）]", "", req.sentence)
-        logger.info(f"{log_prefix}Retrying with clean sentence: {cleaned!r}")
-        try:
-            t0 = time.perf_counter()
-            result = breakdown_service.explain(cleaned, req.focus)
-            elapsed = (time.perf_counter() - t0) * 1000
-            logger.info(f"{log_prefix}Retry Request Time: {elapsed:.1f} ms")
-            result_dict = result if isinstance(result, dict) \
-                else result.model_dump()
-            result_dict["sentence"] = req.sentence
-            return result_dict
-        except Exception as e2:
-            logger.exception(f"{log_prefix}Retry failed")
-            raise HTTPException(
-                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                detail=str(e2))
+    return await _explain_with_retry(breakdown_service.explain,
+                                     req.sentence, req.focus,
+                                     log_prefix=log_prefix)
 
 
 @gpt_router.post("/custom_breakdown", response_model=BreakdownResponse)
@@ -71,32 +83,9 @@ async def custom_breakdown(
     logger.info(
         f"{log_prefix}Custom Breakdown Request: sentence={req.sentence!r} \
             focus={req.focus!r} sysMsg={req.sysMsg!r} prompt={req.prompt!r}")
-    try:
-        t0 = time.perf_counter()
-        result = breakdown_service.explain_custom(req.sentence, req.sysMsg,
-                                                  req.prompt, req.focus)
-        elapsed = (time.perf_counter() - t0) * 1000
-        logger.info(f"{log_prefix}Request Time: {elapsed:.1f} ms")
-        return result
-    except Exception as e:
-        logger.warning(f"{log_prefix}Custom Breakdown Failed: {e}")
-        cleaned = re.sub(r"[（）]", "", req.sentence)
-        logger.info(f"{log_prefix}Retrying with clean sentence: {cleaned!r}")
-        try:
-            t0 = time.perf_counter()
-            result = breakdown_service.explain_custom(cleaned, req.sysMsg,
-                                                      req.prompt, req.focus)
-            elapsed = (time.perf_counter() - t0) * 1000
-            logger.info(f"{log_prefix}Retry Request Time: {elapsed:.1f} ms")
-            result_dict = result if isinstance(result, dict) \
-                else result.model_dump()
-            result_dict["sentence"] = req.sentence
-            return result_dict
-        except Exception as e2:
-            logger.exception(f"{log_prefix}Retry failed")
-            raise HTTPException(
-                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                detail=str(e2))
+    return await _explain_with_retry(breakdown_service.explain_custom,
+                                     req.sentence, req.sysMsg, req.prompt,
+                                     req.focus, log_prefix=log_prefix)
 
 
 @gpt_router.get(
@@ -107,8 +96,9 @@ async def explain_sentence(
     sentence: str = Query(..., description="Japanese sentence to explain")
 ):
     try:
-        txt = breakdown_service.gpt_explainer.explain_sentence(sentence)
-        return {"sentence": sentence, "explanation": txt}
+        txt = await asyncio.to_thread(
+            breakdown_service.gpt_explainer.explain_sentence, sentence)
+        return ORJSONResponse({"sentence": sentence, "explanation": txt})
     except Exception as e:
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
                             detail=str(e))
@@ -1,14 +1,37 @@
-from fastapi import APIRouter
+from fastapi import APIRouter, Response
 from utils.system_info_utils import get_system_info
+from typing import Any, Dict, Optional, Tuple
+import asyncio
+import os
+import time
 
 health_router = APIRouter(prefix="/health")
 
+# Pre-encoded body; a fresh Response per call because middleware (CORS)
+# appends to the response's header list in place
+_HEALTH_OK = b'{"status":"ok"}'
+
+# Monitoring scrapes don't need per-call freshness
+SYSTEM_INFO_TTL = float(os.getenv("SYSTEM_INFO_TTL", "1.0"))
+_SYS_CACHE: Tuple[float, Optional[Dict[str, Any]]] = (0.0, None)
+_sys_lock = asyncio.Lock()
+
 
 @health_router.get("/status")
 async def health_check():
-    return {"status": "ok"}
+    return Response(content=_HEALTH_OK, media_type="application/json")
 
 
 @health_router.get("/system")
 async def gpu_check():
-    return get_system_info()
+    global _SYS_CACHE
+    cached_at, info = _SYS_CACHE
+    if info is not None and time.monotonic() - cached_at < SYSTEM_INFO_TTL:
+        return info
+    async with _sys_lock:
+        # Another request may have refreshed it while we waited
+        cached_at, info = _SYS_CACHE
+        if info is None or time.monotonic() - cached_at >= SYSTEM_INFO_TTL:
+            info = await asyncio.to_thread(get_system_info)
+            _SYS_CACHE = (time.monotonic(), info)
+    return info
@@ -1,8 +1,7 @@
 import logging
-import uuid
+import secrets
 import os
-import shutil
-import json
+import orjson
 from fastapi import (
     APIRouter, Depends, HTTPException, status,
     File, UploadFile, Form, Path
@@ -24,6 +23,8 @@ from db.Tables import (gpt_templates,
                        )
 from profile_manager import ensure_profile_exists
 from utils.anki_utils import AnkiExporter
+from utils.upload_utils import save_upload
+from utils.id_utils import new_id
 logger = logging.getLogger(__name__)
 profile_router = APIRouter(prefix='/profiles',
                            dependencies=[Depends(ensure_profile_exists)])
@@ -68,7 +69,7 @@ async def upsert_gpt_template(template_data: GptTemplateBase,
                     **values))
         tid = ex.id
     else:
-        tid = str(uuid.uuid4())
+        tid = new_id()
         values["id"] = tid
         await db.execute(gpt_templates.insert().values(**values))
     return GptTemplateResponse(id=tid, sysMsg=values["sys_msg"],
@@ -106,41 +107,41 @@ async def save_video_clip(profile_id: str = Depends(ensure_profile_exists),
     p_path = os.path.join(BASE_MEDIA_PATH, "profiles",
                           profile_id, "clips")
     os.makedirs(p_path, exist_ok=True)
-    fname = f"{uuid.uuid4()}_{video_clip.filename}"
+    fname = f"{secrets.token_hex(16)}_{video_clip.filename}"
     loc = os.path.join(p_path, fname)
     rel_path = os.path.join("profiles",
                             profile_id,
                             "clips",
                             fname)
     try:
-        with open(loc, "wb+") as f:
-            shutil.copyfileobj(video_clip.file, f)
-        gpt_j = json.loads(gpt_breakdown_response)
+        await save_upload(video_clip, loc)
+        gpt_j = orjson.loads(gpt_breakdown_response)
         s_time = float(clip_start_time)
         e_time = float(clip_end_time)
         db = await get_db()
-        c_id = str(uuid.uuid4())
-        await db.execute(
-            clips.insert().values(
-                id=c_id,
-                profile_id=profile_id,
-                clip_start_time=s_time,
-                clip_end_time=e_time,
-                gpt_breakdown_response=gpt_j,
-                video_clip_path=rel_path,
-                original_video_file_name=original_video_file_name,
-                original_video_url=original_video_url))
-        await db.execute(
-            profile_files.insert().values(
-                id=str(uuid.uuid4()),
-                profile_id=profile_id,
-                file_name=video_clip.filename,
-                file_path=rel_path,
-                file_type="video_clip"))
+        c_id = new_id()
+        async with db.transaction():
+            await db.execute(
+                clips.insert().values(
+                    id=c_id,
+                    profile_id=profile_id,
+                    clip_start_time=s_time,
+                    clip_end_time=e_time,
+                    gpt_breakdown_response=gpt_j,
+                    video_clip_path=rel_path,
+                    original_video_file_name=original_video_file_name,
+                    original_video_url=original_video_url))
+            await db.execute(
+                profile_files.insert().values(
+                    id=new_id(),
+                    profile_id=profile_id,
+                    file_name=video_clip.filename,
+                    file_path=rel_path,
+                    file_type="video_clip"))
         return {"success": True,
                 "message": "Clip saved successfully.",
                 "clip_id": c_id}
-    except json.JSONDecodeError:
+    except orjson.JSONDecodeError:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST,
                             detail="Invalid JSON.")
     except ValueError:
@@ -167,7 +168,8 @@ async def get_saved_clips(profile_id: str = Depends(ensure_profile_exists)):
     return [
         ClipResponse(id=c.id,
                      get_url=f"/media/{c.video_clip_path}",
-                     breakdown_response=json.dumps(c.gpt_breakdown_response)
+                     breakdown_response=orjson.dumps(
+                         c.gpt_breakdown_response).decode()
                      ) for c in await db.fetch_all(query)]
 
 
@@ -186,12 +188,13 @@ async def delete_saved_clip(clipId: str = Path(...,
     if not clip_r:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND,
                             detail="Clip not found.")
-    await db.execute(
-        clips.delete().where(clips.c.id == clipId).where(
-            clips.c.profile_id == profile_id))
-    await db.execute(profile_files.delete().where(
-        profile_files.c.file_path == clip_r.video_clip_path
-        ).where(profile_files.c.profile_id == profile_id))
+    async with db.transaction():
+        await db.execute(
+            clips.delete().where(clips.c.id == clipId).where(
+                clips.c.profile_id == profile_id))
+        await db.execute(profile_files.delete().where(
+            profile_files.c.file_path == clip_r.video_clip_path
+            ).where(profile_files.c.profile_id == profile_id))
     fp = os.path.join(BASE_MEDIA_PATH, clip_r.video_clip_path)
     if os.path.exists(fp):
         try:
@@ -305,14 +308,22 @@ async def delete_profile_transcript(
     if not trans_r:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND,
                             detail="Transcript not found.")
-    await db.execute(profile_transcripts.delete().where(
-        profile_transcripts.c.id == transcriptId))
+    aud_path = trans_r.audio_file_path
+    removed_files = 0
+    async with db.transaction():
+        # Detach referencing files first so the FK check allows the delete
+        await db.execute(profile_files.update().where(
+            profile_files.c.related_transcript_id == transcriptId
+            ).values(related_transcript_id=None))
+        await db.execute(profile_transcripts.delete().where(
+            profile_transcripts.c.id == transcriptId))
+        if aud_path:
+            removed_files = await db.execute(profile_files.delete().where(
+                profile_files.c.file_path == aud_path
+                ).where(profile_files.c.profile_id == profile_id))
     logger.info(f"Del transcript {transcriptId}")
-    if trans_r.audio_file_path:
-        aud_path = trans_r.audio_file_path
-        if await db.execute(profile_files.delete().where(
-            profile_files.c.file_path == aud_path
-             ).where(profile_files.c.profile_id == profile_id)) > 0:
+    if aud_path:
+        if removed_files > 0:
             logger.info(f"Del assoc. profile_files for: {aud_path}")
             fp_aud = os.path.join(BASE_MEDIA_PATH, aud_path)
             if os.path.exists(fp_aud):
@@ -355,7 +366,7 @@ async def export_anki_deck(profile_id: str = Depends(ensure_profile_exists)):
                       )
     anki_dir = pathlib.Path(TEMP_MEDIA_PATH) / 'profiles' / profile_id / 'anki'
     anki_dir.mkdir(parents=True, exist_ok=True)
-    pkg_fn = f"{uuid.uuid4()}_saved_deck.apkg"
+    pkg_fn = f"{secrets.token_hex(16)}_saved_deck.apkg"
     outpath = anki_dir / pkg_fn
     anki.export(outpath)
     media_path = f"/media/temp/profiles/{profile_id}/anki/{pkg_fn}"
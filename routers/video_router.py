@@ -10,17 +10,18 @@ from fastapi import (
 )
 import asyncio
 from profile_manager import ensure_profile_exists
+from model_manager import get_fwhisper
 import shutil
 from db.db import get_db
 from db.Tables import profile_files
-import uuid
+import secrets
 from utils.env_utils import using_modal
-from processing.audio_processing import AudioTools
+from utils.upload_utils import save_upload
+from utils.id_utils import new_id
+from utils.tmp_utils import ensure_dir
+from processing.audio_processing import get_audio_tools
 from processing.Processor import Processor
 USING_MODAL = using_modal()
-if not USING_MODAL:
-    from processing.whisper_wrapper import FWhisperWrapper
-    fwhisper = FWhisperWrapper()
 
 
 logger = logging.getLogger(__name__)
@@ -38,6 +39,7 @@ TEMP_DIR.mkdir(parents=True, exist_ok=True)
 async def generate_srt(
     video_file: UploadFile = File(...),
     profile_id: str = Depends(ensure_profile_exists),
+    fwhisper=Depends(get_fwhisper),
 ):
     if not profile_id:
         raise HTTPException(
@@ -45,10 +47,10 @@ async def generate_srt(
             detail="X-Profile-ID header is required.",
         )
 
-    op_id = str(uuid.uuid4())
+    op_id = secrets.token_hex(16)
     op_tmp_dir = Path(TEMP_DIR / f"gen_srt_{profile_id}_{op_id}")
     srt_dir = PROFILES_DIR / profile_id / "subtitles"
-    srt_dir.mkdir(parents=True, exist_ok=True)
+    ensure_dir(srt_dir)
     srt_fp = (srt_dir / f"{op_id}.srt")
     relative_srt_fp = (
         Path("profiles") / profile_id / "subtitles" / f"{op_id}.srt"
@@ -60,15 +62,14 @@ async def generate_srt(
 
     try:
         # 1. Save uploaded video to operation's temp dir
-        with open(tmp_vid_upload_loc, "wb+") as f_obj:
-            shutil.copyfileobj(video_file.file, f_obj)
+        await save_upload(video_file, tmp_vid_upload_loc)
         logger.info(f"Temp video for SRT: {tmp_vid_upload_loc}")
 
-        # 2. Init AudioTools with operation's temp dir
-        audio_tools = AudioTools(working_dir=op_tmp_dir)
+        # 2. Shared AudioTools instance
+        audio_tools = get_audio_tools()
 
         # 3. Extract audio
-        extracted_audio_fpath = audio_tools.extract_audio(
+        extracted_audio_fpath = await audio_tools.extract_audio_async(
             input_path=str(tmp_vid_upload_loc)
         )
         if not extracted_audio_fpath or not Path(extracted_audio_fpath
@@ -85,11 +86,6 @@ async def generate_srt(
         if USING_MODAL:
             logger.info("Conversion sent to Modal")
             logger.info(f"Local Filepath: {extracted_audio_fpath}")
-            # Fix path for Internal Mounted Modal Container
-            parts = Path(extracted_audio_fpath).parts
-            extracted_audio_fpath = Path(*parts[-4:])
-            logger.info(
-                f"Media Filepath Adapted for Modal: {extracted_audio_fpath}")
             srt_result = await processor.modal_transcribe_to_srt(
                     media_fp=str(extracted_audio_fpath),
                     )
@@ -118,7 +114,7 @@ async def generate_srt(
 
         # 5. Save metadata
         db = await get_db()
-        vid_rec_id = str(uuid.uuid4())
+        vid_rec_id = new_id()
         ins_vid_query = profile_files.insert().values(
             id=vid_rec_id,
             profile_id=profile_id,
@@ -164,7 +160,7 @@ async def convert_to_mp4(
             detail="X-Profile-ID header is required.",
         )
 
-    op_id = str(uuid.uuid4())
+    op_id = secrets.token_hex(16)
     op_tmp_dir = TEMP_DIR / f"convert_mp4_{profile_id}_{op_id}"
     op_tmp_dir.mkdir(parents=True, exist_ok=True)
 
@@ -173,7 +169,7 @@ async def convert_to_mp4(
 
     # Final storage paths
     prof_conv_dir = PROFILES_DIR / profile_id / "converted"
-    prof_conv_dir.mkdir(parents=True, exist_ok=True)
+    ensure_dir(prof_conv_dir)
 
     # Using unique names for stored files
     conv_fname_stem = Path(video_file.filename).stem
@@ -187,8 +183,7 @@ async def convert_to_mp4(
 
     try:
         # 1. Save uploaded video to temp location
-        with open(tmp_uploaded_vid_loc, "wb+") as f_obj:
-            shutil.copyfileobj(video_file.file, f_obj)
+        await save_upload(video_file, tmp_uploaded_vid_loc)
         logger.info(f"Temp video for conversion: {tmp_uploaded_vid_loc}")
 
         # 3. Convert video, saving to final converted location
@@ -206,9 +201,8 @@ async def convert_to_mp4(
             logger.info("Running Locally")
             logger.info(f"Video Filepath:{tmp_uploaded_vid_loc}")
             logger.info(f"Output Path: {final_conv_stored_loc}")
-            audio_tools = AudioTools(working_dir=op_tmp_dir)
-            conv_path_obj = await asyncio.to_thread(
-                audio_tools.to_mp4,
+            audio_tools = get_audio_tools()
+            conv_path_obj = await audio_tools.to_mp4_async(
                 input_path=str(tmp_uploaded_vid_loc),
                 output_path=str(final_conv_stored_loc),
                 use_nvenc=True
@@ -224,7 +218,7 @@ async def convert_to_mp4(
 
         # 5. Save metadata for converted files to DB
         db = await get_db()
-        conv_rec_id = str(uuid.uuid4())
+        conv_rec_id = new_id()
 
         ins_conv_q = profile_files.insert().values(
             id=conv_rec_id,
@@ -0,0 +1,55 @@
+import pytest
+
+pytest.importorskip("openai")
+pytest.importorskip("orjson")
+from processing.gpt_wrapper import SSE_DONE, _sse_delta
+
+
+def test_content_delta():
+    line = 'data: {"choices": [{"delta": {"content": "こんにちは"}}]}'
+    assert _sse_delta(line) == "こんにちは"
+
+
+def test_done_marker():
+    assert _sse_delta("data: [DONE]") is SSE_DONE
+
+
+@pytest.mark.parametrize("line", [
+    "",
+    ": keep-alive",
+    "event: message",
+    'data: {"choices": [{"delta": {"role": "assistant"}}]}',
+    'data: {"choices": [{"delta": {"content": null}}]}',
+    'data: {"choices": [{"delta": {}, "finish_reason": "stop"}]}',
+    'data: {"choices": []}',
+    'data: {"usage": {"total_tokens": 12}}',
+])
+def test_lines_without_content(line):
+    assert _sse_delta(line) == ""
+
+
+def test_error_frame_raises():
+    line = 'data: {"error": {"message": "Rate limit reached"}}'
+    with pytest.raises(Exception, match="Rate limit reached"):
+        _sse_delta(line)
+
+
+def test_error_frame_with_plain_message_raises():
+    with pytest.raises(Exception, match="boom"):
+        _sse_delta('data: {"error": "boom"}')
+
+
+def test_stream_reassembles():
+    lines = ['data: {"choices": [{"delta": {"role": "assistant"}}]}',
+             "",
+             'data: {"choices": [{"delta": {"content": "Hel"}}]}',
+             'data: {"choices": [{"delta": {"content": "lo"}}]}',
+             "data: [DONE]",
+             'data: {"choices": [{"delta": {"content": "ignored"}}]}']
+    parts = []
+    for line in lines:
+        text = _sse_delta(line)
+        if text is SSE_DONE:
+            break
+        parts.append(text)
+    assert "".join(parts) == "Hello"
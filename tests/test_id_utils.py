@@ -0,0 +1,32 @@
+import time
+from utils import id_utils
+from utils.id_utils import new_id
+
+
+def test_new_id_length_and_alphabet():
+    for _ in range(100):
+        id_ = new_id()
+        assert len(id_) == 26
+        assert set(id_) <= set(id_utils._ALPHABET)
+
+
+def test_new_id_encodes_millisecond_timestamp(monkeypatch):
+    ms = 1_700_000_000_123
+    monkeypatch.setattr(time, "time_ns", lambda: ms * 1_000_000)
+    value = 0
+    for ch in new_id():
+        value = value * 32 + id_utils._ALPHABET.index(ch)
+    assert value >> 80 == ms
+
+
+def test_new_id_sorts_in_creation_order(monkeypatch):
+    clock = iter(range(1_700_000_000_000, 1_700_000_000_500))
+    monkeypatch.setattr(time, "time_ns",
+                        lambda: next(clock) * 1_000_000)
+    ids = [new_id() for _ in range(500)]
+    assert sorted(ids) == ids
+
+
+def test_new_id_is_unique():
+    ids = {new_id() for _ in range(10_000)}
+    assert len(ids) == 10_000
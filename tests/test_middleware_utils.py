@@ -0,0 +1,57 @@
+import pytest
+
+pytest.importorskip("httpx")
+from starlette.applications import Starlette
+from starlette.responses import PlainTextResponse
+from starlette.routing import Route
+from starlette.testclient import TestClient
+from utils.middleware_utils import SelectiveGZipMiddleware
+
+BODY = "x" * 4096
+
+
+async def body(request):
+    return PlainTextResponse(BODY)
+
+
+async def small(request):
+    return PlainTextResponse("ok")
+
+
+@pytest.fixture
+def client():
+    app = Starlette(routes=[Route("/profiles", body),
+                            Route("/media/clip.mp4", body),
+                            Route("/gpt/stream/abc", body),
+                            Route("/small", small)])
+    app.add_middleware(SelectiveGZipMiddleware)
+    return TestClient(app)
+
+
+def test_gzips_regular_responses(client):
+    r = client.get("/profiles", headers={"Accept-Encoding": "gzip"})
+    assert r.headers.get("content-encoding") == "gzip"
+    assert r.text == BODY
+
+
+@pytest.mark.parametrize("path", ["/media/clip.mp4", "/gpt/stream/abc"])
+def test_excluded_prefixes_pass_through(client, path):
+    r = client.get(path, headers={"Accept-Encoding": "gzip"})
+    assert "content-encoding" not in r.headers
+    assert r.text == BODY
+
+
+def test_small_responses_are_not_gzipped(client):
+    r = client.get("/small", headers={"Accept-Encoding": "gzip"})
+    assert "content-encoding" not in r.headers
+
+
+def test_custom_exclusions():
+    app = Starlette(routes=[Route("/media/a", body), Route("/raw/b", body)])
+    app.add_middleware(SelectiveGZipMiddleware, exclude_prefixes=("/raw",))
+    client = TestClient(app)
+    headers = {"Accept-Encoding": "gzip"}
+    assert client.get("/media/a", headers=headers).headers.get(
+        "content-encoding") == "gzip"
+    assert "content-encoding" not in client.get(
+        "/raw/b", headers=headers).headers
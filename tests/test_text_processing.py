@@ -0,0 +1,151 @@
+from types import SimpleNamespace
+import pytest
+
+pytest.importorskip("fugashi")
+pytest.importorskip("jamdict")
+pytest.importorskip("openai")
+pytest.importorskip("numpy")
+from processing.text_processing import (LemmaCache,
+                                        ResultCache,
+                                        SENTENCE_SENTINEL,
+                                        TokenizerService)
+
+
+def info(n):
+    return {"reading": f"r{n}", "meanings": [f"m{n}"], "jlpt": ""}
+
+
+def test_lemma_cache_evicts_least_recently_used(tmp_path):
+    cache = LemmaCache(maxsize=2, path=tmp_path / "lemmas.json")
+    cache.put("a", info(1))
+    cache.put("b", info(2))
+    # Touching "a" makes "b" the oldest entry
+    assert cache.get("a") == info(1)
+    cache.put("c", info(3))
+    assert len(cache) == 2
+    assert cache.get("b") is None
+    assert cache.get("a") == info(1)
+    assert cache.get("c") == info(3)
+
+
+def test_lemma_cache_persists_in_lru_order(tmp_path):
+    path = tmp_path / "lemmas.json"
+    cache = LemmaCache(maxsize=3, path=path)
+    for n, lemma in enumerate("abc"):
+        cache.put(lemma, info(n))
+    cache.get("a")
+    cache.save()
+
+    loaded = LemmaCache(maxsize=3, path=path)
+    assert len(loaded) == 3
+    loaded.put("d", info(4))
+    # "b" was the least recently used entry when saved
+    assert loaded.get("b") is None
+    assert loaded.get("a") == info(0)
+
+
+def test_lemma_cache_ignores_unreadable_file(tmp_path):
+    path = tmp_path / "lemmas.json"
+    path.write_bytes(b"[1, 2, 3]")
+    assert len(LemmaCache(path=path)) == 0
+    path.write_bytes(b"not json")
+    assert len(LemmaCache(path=path)) == 0
+
+
+def test_lemma_cache_skips_saving_when_empty(tmp_path):
+    path = tmp_path / "lemmas.json"
+    LemmaCache(path=path).save()
+    assert not path.exists()
+
+
+@pytest.fixture
+def tokenizer(tmp_path):
+    try:
+        return TokenizerService(cache_path=tmp_path / "tokens.sqlite")
+    except RuntimeError as e:
+        pytest.skip(f"No MeCab dictionary installed: {e}")
+
+
+def test_tokenize_many_matches_tokenize(tokenizer):
+    sentences = ["今日は晴れです。",
+                 "猫が好き",
+                 "Hello world です",
+                 "今日は晴れです。",
+                 "東京タワーに行った"]
+    expected = [tokenizer.tokenize(s) for s in sentences]
+    tokenizer._disk.execute("DELETE FROM tokenize_cache")
+    assert tokenizer.tokenize_many(sentences) == expected
+
+
+def test_tokenize_many_tokens_never_contain_the_sentinel(tokenizer):
+    sentences = ["雨", "。", "です", "a b"]
+    for tokens in tokenizer.tokenize_many(sentences):
+        for token in tokens:
+            assert SENTENCE_SENTINEL not in token["surface"]
+
+
+def test_tokenize_many_fills_the_disk_cache(tokenizer):
+    tokenizer.tokenize_many(["今日は晴れ", "猫が好き"])
+    assert tokenizer._disk_get("猫が好き") is not None
+
+
+def fake_word(surface, white_space=""):
+    feature = SimpleNamespace(lemma=surface, kana=surface, pos1="名詞")
+    return SimpleNamespace(surface=surface, white_space=white_space,
+                           feature=feature)
+
+
+def test_tokenize_many_falls_back_when_a_token_spans_sentences(tmp_path):
+    service = TokenizerService.__new__(TokenizerService)
+    service._disk = None
+    joined = f"ab{SENTENCE_SENTINEL}cd"
+
+    def tagger(text):
+        if text == joined:
+            # One token swallowing the boundary
+            return [fake_word(joined)]
+        return [fake_word(ch) for ch in text]
+
+    service.tagger = tagger
+    assert service._tag_many(["ab", "cd"]) is None
+    result = service.tokenize_many(["ab", "cd"])
+    assert [[t["surface"] for t in tokens] for tokens in result] == [
+        ["a", "b"], ["c", "d"]]
+
+
+def test_tag_many_splits_on_offsets_with_whitespace():
+    service = TokenizerService.__new__(TokenizerService)
+    words = [fake_word("a"), fake_word("b", " "),
+             fake_word(SENTENCE_SENTINEL),
+             fake_word("c"), fake_word(SENTENCE_SENTINEL),
+             fake_word("d", " ")]
+    service.tagger = lambda text: words
+    result = service._tag_many(["a b", "c", " d"])
+    assert [[t[0] for t in tokens] for tokens in result] == [
+        ["a", "b"], ["c"], ["d"]]
+
+
+def test_result_cache_evicts_least_recently_used():
+    cache = ResultCache(maxsize=2)
+    cache.put(("a",), 1)
+    cache.put(("b",), 2)
+    assert cache.get(("a",)) == 1
+    cache.put(("c",), 3)
+    assert cache.get(("b",)) is None
+    assert cache.get(("a",)) == 1
+    assert cache.get(("c",)) == 3
+
+
+def test_result_cache_overwrite_keeps_size():
+    cache = ResultCache(maxsize=2)
+    cache.put(("a",), 1)
+    cache.put(("a",), 2)
+    cache.put(("b",), 3)
+    assert cache.get(("a",)) == 2
+    assert len(cache._data) == 2
+
+
+def test_result_cache_disabled_at_zero_size():
+    cache = ResultCache(maxsize=0)
+    cache.put(("a",), 1)
+    assert cache.get(("a",)) is None
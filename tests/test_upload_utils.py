@@ -0,0 +1,92 @@
+import hashlib
+import io
+import os
+import tempfile
+import pytest
+
+pytest.importorskip("fastapi")
+from utils import upload_utils
+from utils.upload_utils import copy_upload
+
+DATA = os.urandom(3 * upload_utils.COPY_CHUNK + 123)
+needs_sendfile = pytest.mark.skipif(not hasattr(os, "sendfile"),
+                                    reason="os.sendfile unavailable")
+
+
+@pytest.fixture
+def disk_upload():
+    f = tempfile.SpooledTemporaryFile(max_size=1)
+    f.write(DATA)
+    f.seek(0)
+    assert f._rolled
+    yield f
+    f.close()
+
+
+@needs_sendfile
+def test_disk_upload_uses_sendfile(tmp_path, disk_upload, monkeypatch):
+    calls = []
+    sendfile = os.sendfile
+
+    def counting_sendfile(*args):
+        calls.append(args)
+        return sendfile(*args)
+
+    monkeypatch.setattr(os, "sendfile", counting_sendfile)
+    dest = tmp_path / "out.bin"
+    copy_upload(disk_upload, dest)
+    assert calls
+    assert dest.read_bytes() == DATA
+
+
+@needs_sendfile
+def test_in_memory_upload_skips_sendfile(tmp_path, monkeypatch):
+    def fail(*args):
+        raise AssertionError("sendfile used for an in-memory upload")
+
+    monkeypatch.setattr(os, "sendfile", fail)
+    src = tempfile.SpooledTemporaryFile(max_size=len(DATA) + 1)
+    src.write(DATA)
+    src.seek(0)
+    dest = tmp_path / "out.bin"
+    copy_upload(src, dest)
+    # Copying must not roll the upload over to disk
+    assert not src._rolled
+    assert dest.read_bytes() == DATA
+
+
+def test_file_without_descriptor_falls_back(tmp_path):
+    dest = tmp_path / "out.bin"
+    copy_upload(io.BytesIO(DATA), dest)
+    assert dest.read_bytes() == DATA
+
+
+@needs_sendfile
+def test_sendfile_error_falls_back_to_copy(tmp_path, disk_upload,
+                                          monkeypatch):
+    def partial_then_fail(out_fd, in_fd, offset, count):
+        if offset == 0:
+            # Leave a partial write behind before failing
+            os.write(out_fd, DATA[:1000])
+            return 1000
+        raise OSError(22, "Invalid argument")
+
+    monkeypatch.setattr(os, "sendfile", partial_then_fail)
+    dest = tmp_path / "out.bin"
+    copy_upload(disk_upload, dest)
+    assert dest.read_bytes() == DATA
+
+
+def test_copy_starts_at_current_offset(tmp_path, disk_upload):
+    disk_upload.seek(10)
+    dest = tmp_path / "out.bin"
+    copy_upload(disk_upload, dest)
+    assert dest.read_bytes() == DATA[10:]
+
+
+def test_hasher_sees_every_byte(tmp_path, disk_upload):
+    hasher = hashlib.sha256()
+    dest = tmp_path / "out.bin"
+    copy_upload(disk_upload, dest, hasher)
+    assert dest.read_bytes() == DATA
+    assert hasher.hexdigest() == hashlib.sha256(DATA).hexdigest()
@@ -0,0 +1,52 @@
+from datetime import timedelta
+import pytest
+
+pytest.importorskip("openai")
+from processing.whisper_wrapper import _format_cue, _format_timestamp
+
+
+@pytest.mark.parametrize("secs, expected", [
+    (0, "00:00:00,000"),
+    (1.5, "00:00:01,500"),
+    (59.999, "00:00:59,999"),
+    (61.25, "00:01:01,250"),
+    (3661.007, "01:01:01,007"),
+    (36000, "10:00:00,000"),
+    # Truncated to the millisecond, not rounded
+    (2.0009, "00:00:02,000"),
+    # Float noise below a microsecond rounds away first
+    (0.29999999999, "00:00:00,300"),
+])
+def test_format_timestamp(secs, expected):
+    assert _format_timestamp(secs) == expected
+
+
+def test_format_cue():
+    assert _format_cue(3, 1.0, 2.5, "こんにちは") == (
+        "3\n00:00:01,000 --> 00:00:02,500\nこんにちは\n\n")
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("a\n\n\nb", "a\nb"),
+    ("\nleading", "leading"),
+    ("trailing\n\n", "trailing"),
+    ("", ""),
+])
+def test_format_cue_collapses_blank_lines(text, expected):
+    cue = _format_cue(1, 0, 1, text)
+    assert cue == f"1\n00:00:00,000 --> 00:00:01,000\n{expected}\n\n"
+
+
+@pytest.mark.parametrize("start, end, text", [
+    (0, 1.5, "hello"),
+    (12.3456789, 3725.0004, "multi\nline"),
+    (0.1 + 0.2, 1 / 3, "a\n\nb"),
+    (5, 6, "\nx\n"),
+])
+def test_format_cue_matches_srt(start, end, text):
+    srt = pytest.importorskip("srt")
+    expected = srt.Subtitle(index=7,
+                            start=timedelta(seconds=start),
+                            end=timedelta(seconds=end),
+                            content=text).to_srt()
+    assert _format_cue(7, start, end, text) == expected
@@ -1,11 +1,36 @@
-from typing import List, Dict, Optional
+from typing import List, Dict, Optional, Union
+from functools import lru_cache
+from pathlib import Path
 from dotenv import load_dotenv
+from pydantic_settings import BaseSettings, SettingsConfigDict
 import logging
-import os
 
 logger = logging.getLogger(__name__)
 
 
+class Settings(BaseSettings):
+    """
+    API keys read from the environment / .env file.
+    """
+    OPENAI_API_KEY: Optional[str] = None
+    MODAL_TOKEN_ID: Optional[str] = None
+    MODAL_TOKEN_SECRET: Optional[str] = None
+
+    model_config = SettingsConfigDict(env_file=".env", extra="ignore")
+
+
+@lru_cache
+def get_settings(dotenv_path: Union[str, Path, None] = None) -> Settings:
+    """
+    Read the environment once per dotenv path and cache the result.
+    """
+    # Still export the .env values for libraries that read os.environ
+    load_dotenv(dotenv_path=dotenv_path)
+    if dotenv_path:
+        return Settings(_env_file=dotenv_path)
+    return Settings()
+
+
 def check_env(expected: List,
               input: Dict,
               dotenv_path: Optional[str] = None
@@ -14,10 +39,8 @@ def check_env(expected: List,
     Check if environment variables are available
     and return dictionary with expected variables
     """
-    # Load from dotenv
-    load_dotenv(dotenv_path=dotenv_path)
-    # Get available vars from env
-    API_KEYS = {k: v for k, v in os.environ.items() if k in expected}
+    available = get_settings(dotenv_path).model_dump(exclude_none=True)
+    API_KEYS = {k: available[k] for k in expected if k in available}
     logger.info(f"Retrieved {','.join(API_KEYS.keys())} from ENV")
     missing = [k for k in expected if k not in API_KEYS.keys()]
     # Get missing from input
@@ -31,8 +54,7 @@ def check_env(expected: List,
 
 
 def using_modal() -> bool:
-    load_dotenv()
-    keys = ["MODAL_TOKEN_ID", "MODAL_TOKEN_SECRET"]
-    if keys[0] in os.environ and keys[1] in os.environ:
+    settings = get_settings()
+    if settings.MODAL_TOKEN_ID and settings.MODAL_TOKEN_SECRET:
         return True
     return False
@@ -0,0 +1,20 @@
+import os
+import time
+
+# Crockford base32, as used by ULID
+_ALPHABET = "0123456789ABCDEFGHJKMNPQRSTVWXYZ"
+
+
+def new_id() -> str:
+    """
+    Generate a 26-char ULID: 48-bit millisecond timestamp followed by
+    80 random bits. Ids sort lexicographically in creation order, so
+    new rows append to the right edge of the primary key B-tree.
+    """
+    value = (time.time_ns() // 1_000_000) << 80
+    value |= int.from_bytes(os.urandom(10), "big")
+    chars = []
+    for _ in range(26):
+        chars.append(_ALPHABET[value & 0x1F])
+        value >>= 5
+    return "".join(reversed(chars))
@@ -0,0 +1,29 @@
+from typing import Tuple
+from starlette.middleware.gzip import GZipMiddleware
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+
+class SelectiveGZipMiddleware(GZipMiddleware):
+    """
+    GZip JSON responses while passing through paths whose bodies are
+    already compressed (media) or must not be buffered (SSE streams).
+    """
+    def __init__(self,
+                 app: ASGIApp,
+                 minimum_size: int = 1024,
+                 compresslevel: int = 6,
+                 exclude_prefixes: Tuple[str, ...] = ("/media",
+                                                      "/gpt/stream")
+                 ) -> None:
+        super().__init__(app,
+                         minimum_size=minimum_size,
+                         compresslevel=compresslevel)
+        self.exclude_prefixes = exclude_prefixes
+
+    async def __call__(self, scope: Scope, receive: Receive,
+                       send: Send) -> None:
+        if (scope["type"] == "http"
+                and scope["path"].startswith(self.exclude_prefixes)):
+            await self.app(scope, receive, send)
+            return
+        await super().__call__(scope, receive, send)
@@ -1,10 +1,10 @@
-from typing import (Union,
+from typing import (AsyncIterator,
+                    Union,
                     Iterator)
 from processing.gpt_wrapper import GptModel
 import logging
 from pathlib import Path
 import asyncio
-from fastapi import HTTPException
 from typing import Callable
 from fastapi.responses import StreamingResponse
 
@@ -27,18 +27,39 @@ def generate_reply(version: str,
         return None
 
 
-def sse_gen(version: str,
-            system_message: str,
-            prompt: str):
-    reply = generate_reply(version,
-                           system_message,
-                           prompt)
+async def agenerate_reply(version: str,
+                          sys_msg: str,
+                          prompt: str) -> AsyncIterator[str]:
+    """Async `generate_reply`, streamed through the AsyncOpenAI client.
+    Errors are logged and re-raised so the caller can report them."""
+    try:
+        model = GptModel(
+                version=version,
+                system_msg=sys_msg)
+        async for chunk in model.astream_request(prompt):
+            yield chunk
+    except Exception as e:
+        logger.error(str(e))
+        raise
+
 
-    if not reply:
-        logger.error("Failed to generate stream")
-        raise HTTPException(400, "Failed to generate stream")
-    for chunk in reply:
-        yield f"data: {chunk}\n\n"
+async def sse_gen(version: str,
+                  system_message: str,
+                  prompt: str) -> AsyncIterator[str]:
+    """
+    SSE frames for a chat stream. An async generator, so Starlette
+    iterates it on the event loop instead of a threadpool per chunk.
+    A failure ends the stream with an `error` event instead of `done`.
+    """
+    try:
+        async for chunk in agenerate_reply(version,
+                                           system_message,
+                                           prompt):
+            yield f"data: {chunk}\n\n"
+    except Exception:
+        # Details stay in the log; provider errors can echo key material
+        yield "event: error\ndata: Failed to generate stream\n\n"
+        return
     yield "event: done\ndata:\n\n"
 
 
@@ -26,14 +26,15 @@ def gpu_available() -> Dict[bool, str]:
 
 
 def get_system_info() -> Dict[str, Any]:
+    gpu = gpu_available()
     info: Dict[str, Any] = {
         "time": datetime.datetime.now().isoformat(timespec="seconds") + "Z",
         "hostname": socket.gethostname(),
         "platform": platform.platform(aliased=True, terse=True),
         "python": platform.python_version(),
         "cpu_cores": os.cpu_count(),
-        "gpu_available": gpu_available()['available'],
-        'gpu_name': gpu_available()["name"]
+        "gpu_available": gpu["available"],
+        "gpu_name": gpu["name"]
     }
 
     return info
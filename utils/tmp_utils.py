@@ -0,0 +1,53 @@
+from typing import Optional, Set
+from pathlib import Path
+import logging
+import shutil
+import tempfile
+import uuid
+
+logger = logging.getLogger(__name__)
+
+_TMP_ROOT: Optional[Path] = None
+# Persistent directories already created by this process
+_CREATED_DIRS: Set[Path] = set()
+
+
+def tmp_root() -> Path:
+    """
+    Process-wide scratch directory, created on first use.
+    """
+    global _TMP_ROOT
+    if _TMP_ROOT is None or not _TMP_ROOT.is_dir():
+        _TMP_ROOT = Path(tempfile.mkdtemp(prefix="mirumoji-"))
+        logger.info(f"Scratch root at '{_TMP_ROOT}'")
+    return _TMP_ROOT
+
+
+def new_work_dir(prefix: str = "") -> Path:
+    """
+    Create a unique sub-directory under the scratch root.
+    """
+    work = tmp_root() / f"{prefix}{uuid.uuid4().hex}"
+    work.mkdir(parents=True)
+    return work
+
+
+def cleanup_tmp_root() -> None:
+    """
+    Remove the scratch root and everything under it.
+    """
+    global _TMP_ROOT
+    if _TMP_ROOT is not None:
+        shutil.rmtree(_TMP_ROOT, ignore_errors=True)
+        _TMP_ROOT = None
+
+
+def ensure_dir(path: Path) -> Path:
+    """
+    mkdir -p `path`, skipping the syscalls once this process has
+    already created it.
+    """
+    if path not in _CREATED_DIRS:
+        path.mkdir(parents=True, exist_ok=True)
+        _CREATED_DIRS.add(path)
+    return path
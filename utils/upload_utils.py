@@ -0,0 +1,79 @@
+from typing import Any, BinaryIO, Optional, Union
+from pathlib import Path
+from fastapi import UploadFile
+import asyncio
+import io
+import logging
+import os
+import shutil
+
+logger = logging.getLogger(__name__)
+
+COPY_CHUNK = 1024 * 1024
+
+
+def _source_fd(src: BinaryIO) -> Optional[int]:
+    """
+    File descriptor backing an upload, or None while Starlette's
+    SpooledTemporaryFile still holds it in memory (calling fileno()
+    there would force a rollover, i.e. an extra copy).
+    """
+    if not getattr(src, "_rolled", True):
+        return None
+    try:
+        return src.fileno()
+    except (AttributeError, OSError, io.UnsupportedOperation):
+        return None
+
+
+def _copy_hashing(src: BinaryIO, out: BinaryIO, hasher: Any) -> None:
+    read, update, write = src.read, hasher.update, out.write
+    while chunk := read(COPY_CHUNK):
+        update(chunk)
+        write(chunk)
+
+
+def copy_upload(src: BinaryIO,
+                dest: Union[str, Path],
+                hasher: Optional[Any] = None) -> None:
+    """
+    Copy an uploaded file object to `dest`. Disk-backed uploads are
+    moved with os.sendfile so the bytes never pass through Python;
+    in-memory ones fall back to shutil.copyfileobj. When a hashlib
+    `hasher` is given the bytes are read once, feeding both the hash
+    and the destination.
+    """
+    if hasher is not None:
+        with open(dest, "wb") as out:
+            _copy_hashing(src, out, hasher)
+        return
+    in_fd = _source_fd(src) if hasattr(os, "sendfile") else None
+    with open(dest, "wb") as out:
+        if in_fd is not None:
+            # Push any buffered writes down to the descriptor first
+            src.flush()
+            start = offset = src.tell()
+            size = os.fstat(in_fd).st_size
+            try:
+                while offset < size:
+                    sent = os.sendfile(out.fileno(), in_fd, offset,
+                                       size - offset)
+                    if sent == 0:
+                        break
+                    offset += sent
+                return
+            except OSError as e:
+                logger.warning(f"sendfile failed, copying instead: {e}")
+                src.seek(start)
+                out.seek(0)
+                out.truncate()
+        shutil.copyfileobj(src, out)
+
+
+async def save_upload(upload: UploadFile,
+                      dest: Union[str, Path],
+                      hasher: Optional[Any] = None) -> None:
+    """
+    Write an UploadFile to `dest` on a worker thread.
+    """
+    await asyncio.to_thread(copy_upload, upload.file, dest, hasher)